@@ -57,11 +57,15 @@ import inspect
 import json
 import os
 import time
-from typing import Any, Callable, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional, Set
 
 from .utils import now_ms
 
 
+# Log directories already created by this process (skips repeat mkdir syscalls)
+_ensured_dirs: Set[str] = set()
+
+
 class JsonlLogger:
     """Production-ready JSON Lines logger for structured event logging.
 
@@ -83,28 +87,44 @@ class JsonlLogger:
 
     Performance:
     - Low latency: buffered I/O with line buffering
-    - Memory efficient: no in-memory log buffering
+    - Memory efficient: no in-memory log buffering unless batching is enabled
+    - Optional batching (batch_size > 1) turns N event writes into one
     - CPU efficient: minimal JSON serialization overhead
     - Thread-compatible: single-writer design
 
     Args:
         path: File path for log output (created if doesn't exist)
+        batch_size: Lines to collect before writing them in one call (1 = write
+                    every event immediately). Pending lines are also written once
+                    the oldest is max_batch_delay_ms old, and on flush()/close().
+        max_batch_delay_ms: How long a batched line may be held back. Enforced by
+                    write() and flush_if_due(); callers with quiet periods (the
+                    bot does this on a timer) call flush_if_due() periodically
 
     Usage:
         logger = JsonlLogger("./data/trades.jsonl")
         logger.write("trade", {"price": 0.65, "size": 100, "side": "BUY"})
     """
 
-    def __init__(self, path: str):
+    def __init__(self, path: str, batch_size: int = 1, max_batch_delay_ms: int = 50):
         """Initialize logger with output file path.
 
         Args:
             path: Complete file path for JSON Lines output
                  Directory structure created automatically if missing
+            batch_size: Events per write call (1 disables batching)
+            max_batch_delay_ms: Maximum age of a pending batched event
         """
         self.path = path
-        # Ensure directory exists for log file
-        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.batch_size = batch_size
+        self.max_batch_delay_ms = max_batch_delay_ms
+        self._pending: List[str] = []
+        self._pending_since_ms = 0
+        # Ensure directory exists for log file (once per directory per process)
+        log_dir = os.path.dirname(path)
+        if log_dir and log_dir not in _ensured_dirs:
+            os.makedirs(log_dir, exist_ok=True)
+            _ensured_dirs.add(log_dir)
         # Open with line buffering (buffering=1) for low-latency writes
         self._fp = open(path, "a", buffering=1)
 
@@ -130,9 +150,36 @@ class JsonlLogger:
             or external synchronization for multi-threaded applications.
         """
         # Create complete log record with timestamp
-        rec = {"ts_ms": now_ms(), "event": event_type, **payload}
+        ts = now_ms()
+        rec = {"ts_ms": ts, "event": event_type, **payload}
         # Write compact JSON without extra whitespace, preserving Unicode
-        self._fp.write(json.dumps(rec, separators=(",", ":"), ensure_ascii=False) + "\n")
+        line = json.dumps(rec, separators=(",", ":"), ensure_ascii=False) + "\n"
+        if self.batch_size <= 1:
+            self._fp.write(line)
+            return
+
+        # Batched mode: one write (and one line-buffer flush) per batch
+        if not self._pending:
+            self._pending_since_ms = ts
+        self._pending.append(line)
+        if (len(self._pending) >= self.batch_size
+                or ts - self._pending_since_ms >= self.max_batch_delay_ms):
+            self.flush()
+
+    def flush(self) -> None:
+        """Write any batched events to the log file."""
+        if self._pending:
+            self._fp.write("".join(self._pending))
+            self._pending.clear()
+
+    def flush_if_due(self) -> None:
+        """Write batched events if the oldest is max_batch_delay_ms old.
+
+        write() only checks the delay when the next event arrives; call this
+        periodically so a quiet feed cannot hold lines back indefinitely.
+        """
+        if self._pending and now_ms() - self._pending_since_ms >= self.max_batch_delay_ms:
+            self.flush()
 
     def close(self) -> None:
         """Flush and close the log file handle.
@@ -145,6 +192,7 @@ class JsonlLogger:
             Always call close() before program termination for data integrity.
         """
         try:
+            self.flush()
             self._fp.close()
         except Exception:
             # Ignore errors during close (file may already be closed)
@@ -202,18 +250,19 @@ class DebugLogger(JsonlLogger):
         'CRITICAL': 50   # Critical failures (lowest verbosity)
     }
 
-    def __init__(self, path: str, level: str = 'INFO'):
+    def __init__(self, path: str, level: str = 'INFO', batch_size: int = 1):
         """Initialize debug logger with configurable verbosity.
 
         Args:
             path: Output file path for JSON Lines logging
             level: Initial logging level (case-insensitive)
                   Defaults to INFO for production use
+            batch_size: Events per write call (see JsonlLogger)
 
         Raises:
             No exceptions raised - invalid levels default to INFO
         """
-        super().__init__(path)
+        super().__init__(path, batch_size=batch_size)
         # Convert level string to numeric value, default to INFO
         self.level = self.LEVELS.get(level.upper(), self.LEVELS['INFO'])
         # Future: context stack for nested operation tracking
@@ -6,43 +6,184 @@ markets for market making, checking volume, liquidity, activity, and other
 key metrics before running PM4.
 """
 
+import argparse
+import asyncio
+import os
+import re
 import requests
+import sys
 import time
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from dataclasses import dataclass, replace
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-from .utils import now_ms
+from .market_cache import FileCache
+from .utils import DATACLASS_SLOTS, now_ms, parse_iso8601
+
+# Optional: aiohttp lets batch analysis overlap all network I/O on one event loop
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+# Optional: orjson decodes API payloads several times faster than stdlib json.
+# Both accept bytes or str and raise ValueError subclasses on bad input.
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    import json
+    _json_loads = json.loads
+
+# Optional: ijson decodes bulk list responses one market at a time
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+
+# Cheap shape check so malformed dates are rejected without raising
+_ISO_DATE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}')
+
+
+def _safe_float(value: Any, default: float = 0.0) -> float:
+    """Safely convert to float with default."""
+    try:
+        return float(value) if value is not None else default
+    except (ValueError, TypeError):
+        return default
+
+
+def _is_json_content_type(content_type: Optional[str]) -> bool:
+    """False only when a response is labelled as non-JSON (e.g. an HTML error page)."""
+    return not content_type or 'json' in content_type
+
+
+def _maybe_json(value: Any) -> Any:
+    """Decode value if the API sent it as a JSON-encoded string ([] if undecodable)."""
+    if isinstance(value, str):
+        try:
+            return _json_loads(value)
+        except ValueError:
+            return []
+    return value
+
+
+# Outcome labels as the Gamma API spells them -> normalised side
+_OUTCOME_SIDES = {'Yes': 'YES', 'YES': 'YES', 'yes': 'YES', 'No': 'NO', 'NO': 'NO', 'no': 'NO'}
+
+
+def _first(data: Dict, *keys: str, default: Any = None) -> Any:
+    """Return the value of the first key present (and not None) in data."""
+    for key in keys:
+        value = data.get(key)
+        if value is not None:
+            return value
+    return default
+
+
+# Numeric MarketAnalysis fields read straight from the API payload:
+# (field name, (primary key, *legacy alias keys))
+_FLOAT_FIELDS = (
+    # Order book metrics (most important for market making)
+    ("bestBid", ("bestBid",)),
+    ("bestAsk", ("bestAsk",)),
+    ("spread", ("spread",)),
+    # Liquidity (critical for market making)
+    ("liquidityClob", ("liquidityClob",)),
+    ("liquidityAmm", ("liquidityAmm",)),
+    # Volume metrics
+    ("volume24hr", ("volume24hr", "volume24h")),
+    ("volume1wk", ("volume1wk", "volume1w")),
+    ("volume24hrAmm", ("volume24hrAmm", "volume24hAmm")),
+    ("volume1wkAmm", ("volume1wkAmm", "volume1wAmm")),
+    ("volume24hrClob", ("volume24hrClob", "volume24hClob")),
+    ("volume1wkClob", ("volume1wkClob", "volume1wClob")),
+    ("volumeAmm", ("volumeAmm",)),
+    ("volumeClob", ("volumeClob",)),
+    # Price changes
+    ("oneDayPriceChange", ("oneDayPriceChange",)),
+    ("oneHourPriceChange", ("oneHourPriceChange",)),
+    ("oneWeekPriceChange", ("oneWeekPriceChange",)),
+    # Liquidity rewards
+    ("rewardsMinSize", ("rewardsMinSize",)),
+    ("rewardsMaxSpread", ("rewardsMaxSpread",)),
+)
+
+
+def _extract_floats(data: Dict) -> Dict[str, float]:
+    """Read every _FLOAT_FIELDS metric in one loop (first parseable key wins, else 0.0)."""
+    floats = {}
+    for name, keys in _FLOAT_FIELDS:
+        value = 0.0
+        for key in keys:
+            raw = data.get(key)
+            if raw is not None:
+                try:
+                    value = float(raw)
+                    break
+                except (ValueError, TypeError):
+                    pass
+        floats[name] = value
+    return floats
+
+
+# Every payload key _analysis_from_data() reads, plus 'slug' for bulk matching
+# and 'closed' for the cache TTL.
+# Streamed bulk responses keep only these; extend when the analysis reads more.
+_MARKET_KEYS = frozenset(
+    [key for _, keys in _FLOAT_FIELDS for key in keys] + [
+        'slug', 'conditionId', 'id', 'activeUsers', 'uniqueTraders',
+        'endDate', 'startDate', 'createdAt', 'created_at',
+        'outcomePrices', 'price', 'yesPrice', 'lastTradeTimestamp',
+        'clobTokenIds', 'tokens', 'closed',
+    ]
+)
+
+
+def _parse_iso_datetime(value: Any) -> Optional[datetime]:
+    """Parse an ISO-8601 timestamp from the Gamma API, or None if it isn't one."""
+    if not isinstance(value, str) or len(value) < 10 or not _ISO_DATE_RE.match(value):
+        return None
+    try:
+        return parse_iso8601(value)
+    except ValueError:
+        # Passes the shape check but is not a real date (e.g. month 13)
+        return None
+
+
+# All supported Polymarket URL formats as one alternation, so a URL is scanned
+# once instead of once per format. Every branch feeds the same slug group.
+_SLUG_RE = re.compile(
+    r'(?:'
+    r'polymarket\.com/market/'            # Standard market URLs
+    r'|polymarket\.com/event/[^/]+/'      # Event URLs: /event/event-id/market-slug
+    r'|polymarket\.com/event/'            # Direct event URLs: /event/market-slug (no event-id)
+    r'|gamma\.polymarket\.com/market/'    # Gamma market URLs
+    r'|https?://[^/]+/market/'            # Generic market URLs
+    r'|https?://[^/]+/event/[^/]+/'       # Generic event URLs with event-id
+    r'|https?://[^/]+/event/'             # Generic direct event URLs
+    r')([^/?#]+)'
+)
 
 
 def extract_market_slug(url_or_slug: str) -> str:
     """Extract market slug from Polymarket URL or return slug as-is."""
-    import re
-
-    # Check if it's already a slug (no protocol/domain)
+    # Check if it's already a slug (no protocol/domain) - bare slugs skip the regex
     if not url_or_slug.startswith(('http://', 'https://', 'www.')):
         return url_or_slug
 
-    # Handle various Polymarket URL formats
-    patterns = [
-        r'polymarket\.com/market/([^/?]+)',           # Standard market URLs
-        r'polymarket\.com/event/[^/]+/([^/?]+)',      # Event URLs: /event/event-id/market-slug
-        r'polymarket\.com/event/([^/?]+)',            # Direct event URLs: /event/market-slug (no event-id)
-        r'gamma\.polymarket\.com/market/([^/?]+)',    # Gamma market URLs
-        r'https?://[^/]+/market/([^/?]+)',            # Generic market URLs
-        r'https?://[^/]+/event/[^/]+/([^/?]+)',       # Generic event URLs with event-id
-        r'https?://[^/]+/event/([^/?]+)'              # Generic direct event URLs
-    ]
-
-    for pattern in patterns:
-        match = re.search(pattern, url_or_slug)
-        if match:
-            return match.group(1)
+    match = _SLUG_RE.search(url_or_slug)
+    if match:
+        return match.group(1)
 
     raise ValueError(f"Could not extract market slug from: {url_or_slug}. Please provide either a Polymarket URL or market slug.")
 
 
-@dataclass
+@dataclass(frozen=True, **DATACLASS_SLOTS)
 class MarketAnalysis:
     """Market status report with factual metrics for market making evaluation."""
     market_slug: str
@@ -95,28 +236,223 @@ class MarketAnalysis:
         if self.spread == 0 and self.bestBid == 0:
             return "NO_DATA"
         
-        # Check critical market making requirements
+        # Liquidity and activity gate both non-LIMITED outcomes; stop as soon
+        # as either fails instead of evaluating every requirement
         has_liquidity = (self.liquidityClob + self.liquidityAmm) > 1000
-        has_tight_spread = self.spread > 0 and self.spread < 0.05
+        if not has_liquidity:
+            return "LIMITED"
         has_activity = self.volume24hr > 10000 or (self.last_trade_hours is not None and self.last_trade_hours < 24)
-        has_time = self.time_to_resolution_days >= 7
+        if not has_activity:
+            return "LIMITED"
         
-        if has_liquidity and has_tight_spread and has_activity and has_time:
+        # Spread and horizon only separate VIABLE from MARGINAL
+        has_tight_spread = 0 < self.spread < 0.05
+        if has_tight_spread and self.time_to_resolution_days >= 7:
             return "VIABLE"
-        elif has_liquidity and has_activity:
-            return "MARGINAL"
-        else:
-            return "LIMITED"
+        return "MARGINAL"
+
+
+# Result for markets the API returned nothing for; copied per slug with replace()
+_EMPTY_ANALYSIS = MarketAnalysis(
+    market_slug="",
+    condition_id="",
+    spread=0.0,
+    bestBid=0.0,
+    bestAsk=0.0,
+    liquidityClob=0.0,
+    liquidityAmm=0.0,
+    current_price=0.5,
+    volume24hr=0.0,
+    volume24hrClob=0.0,
+    volume24hrAmm=0.0,
+    last_trade_hours=999.0,  # No data available
+    time_to_resolution_days=0,
+)
+
+
+_HEAVY_RULE = "=" * 70
+_LIGHT_RULE = "─" * 70
+_TECHNICAL_HEADER = _LIGHT_RULE + "\nTECHNICAL DETAILS\n" + _LIGHT_RULE + "\n"
+
+# Whole report layout; optional sections are pre-rendered (one line per "\n",
+# or empty) so the report is produced by a single format_map() pass.
+_REPORT_TEMPLATE = (
+    "\n" + _HEAVY_RULE + "\n"
+    "MARKET STATUS REPORT: {market_slug}\n"
+    + _HEAVY_RULE + "\n"
+    "Condition ID: {condition_id}\n"
+    "{header_dates}"
+    "\n" + _LIGHT_RULE + "\n"
+    "DEFINITIONS\n"
+    + _LIGHT_RULE + "\n"
+    "Spread: Difference between best ask and best bid prices.\n"
+    "        Lower spread = tighter market = easier to profit from market making.\n"
+    "        Typical range: 0.5-5% (0.005-0.05 in probability space).\n"
+    "\n"
+    "Liquidity: Available capital in order book (CLOB) or AMM pool.\n"
+    "          Higher liquidity = easier to enter/exit positions without slippage.\n"
+    "          Typical range: $1k-$100k+ for active markets.\n"
+    "\n"
+    "Volume: Total trading activity over time period.\n"
+    "       Higher volume = more opportunities to capture spread.\n"
+    "       Typical range: $10k-$500k+ per day for active markets.\n"
+    "\n"
+    "CLOB: Central Limit Order Book - traditional exchange with limit orders.\n"
+    "AMM: Automated Market Maker - liquidity pool with constant product formula.\n"
+    "\n"
+    + _LIGHT_RULE + "\n"
+    "CORE MARKET MAKING METRICS\n"
+    + _LIGHT_RULE + "\n"
+    "{order_book}"
+    "\n"
+    "{liquidity}"
+    "\n"
+    "Current Price: {current_price:.4f} ({current_price_pct:.2f}%)\n"
+    "  Context: {price_context}\n"
+    "\n"
+    + _LIGHT_RULE + "\n"
+    "ACTIVITY METRICS\n"
+    + _LIGHT_RULE + "\n"
+    "{volume}"
+    "\n"
+    "{price_changes}"
+    "{traders}"
+    "{rewards}"
+    + _LIGHT_RULE + "\n"
+    "MARKET STRUCTURE\n"
+    + _LIGHT_RULE + "\n"
+    "{created}"
+    "{structure_dates}"
+    "Time to Resolution: {time_to_resolution_days} days\n"
+    "  Context: {horizon_context}\n"
+    "\n"
+    "{technical}"
+    + _HEAVY_RULE + "\n\n"
+)
+
+# Resolved markets no longer change, so their cached payloads live much longer
+RESOLVED_CACHE_TTL_MS = 24 * 3600 * 1000
+# Which endpoint (event/market) serves a slug is stable; remember it for a day
+ENDPOINT_HINT_TTL_MS = 24 * 3600 * 1000
+# Slugs neither endpoint knows are not re-queried for this long (seconds)
+NEGATIVE_CACHE_TTL_S = 60.0
 
 
 class MarketAnalyzer:
     """Analyze Polymarket data for PM4 trading suitability."""
 
-    def __init__(self, base_url: str = "https://gamma-api.polymarket.com"):
+    def __init__(
+        self,
+        base_url: str = "https://gamma-api.polymarket.com",
+        use_cache: bool = True,
+        cache_ttl_ms: int = 60_000,
+    ):
         self.base_url = base_url
         self.session = requests.Session()
+        # Pooled keep-alive connections sized for batch analysis, with backoff
+        # on transient server/gateway/rate-limit errors (all requests are GETs). raise_on_status=False returns
+        # the final response so callers keep handling non-200s themselves.
+        adapter = HTTPAdapter(
+            pool_connections=8,
+            pool_maxsize=32,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.2,
+                status_forcelist=(429, 500, 502, 503, 504),
+                raise_on_status=False,
+            ),
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "User-Agent": "PM4/MarketAnalyzer",
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+        })
+        # Short-lived on-disk cache of API responses (None disables caching).
+        # PM4_DISABLE_CACHE=1 turns it off without code changes when debugging.
+        if use_cache and not os.getenv("PM4_DISABLE_CACHE"):
+            self.cache: Optional[FileCache] = FileCache(ttl_ms=cache_ttl_ms)
+        else:
+            self.cache = None
+        # slug -> endpoint ('event' or 'market') that answered last time
+        self._endpoint_hints: Dict[str, str] = {}
+        # slug -> time.monotonic() deadline for slugs both endpoints returned 404 for
+        self._negative_cache: Dict[str, float] = {}
+
+    def _cache_key(self, market_slug: str) -> str:
+        """Cache key for a slug; includes the API host so test/prod data never mix."""
+        return f"{self.base_url}|{market_slug}"
+
+    def _cache_get(self, market_slug: str) -> Optional[Dict]:
+        """Return the cached payload for a slug, or None on a miss (or if caching is off)."""
+        if self.cache is None:
+            return None
+        return self.cache.get(self._cache_key(market_slug))
+
+    def _cache_set(self, market_slug: str, data: Optional[Dict]) -> None:
+        """Cache a fetched payload; resolved markets get RESOLVED_CACHE_TTL_MS."""
+        if self.cache is None or data is None:
+            return
+        ttl_ms = RESOLVED_CACHE_TTL_MS if isinstance(data, dict) and data.get('closed') else None
+        self.cache.set(self._cache_key(market_slug), data, ttl_ms=ttl_ms)
+
+    def _cache_lookup(self, market_slug: str) -> Tuple[str, Optional[Dict]]:
+        """
+        Classify a slug against both caches without touching the network.
+
+        Returns:
+            ("HIT", payload) for a cached response, ("NEG", None) for a slug
+            recently unknown to both endpoints, or ("MISS", None).
+        """
+        expires = self._negative_cache.get(market_slug)
+        if expires is not None:
+            if time.monotonic() < expires:
+                return "NEG", None
+            self._negative_cache.pop(market_slug, None)
+        cached = self._cache_get(market_slug)
+        if cached is not None:
+            return "HIT", cached
+        return "MISS", None
+
+    def _mark_not_found(self, market_slug: str) -> None:
+        """Negative-cache a slug that both endpoints answered 404 for."""
+        self._negative_cache[market_slug] = time.monotonic() + NEGATIVE_CACHE_TTL_S
+
+    def _get_endpoint_hint(self, market_slug: str) -> Optional[str]:
+        """Endpoint that served this slug before (in memory, else from the disk cache)."""
+        hint = self._endpoint_hints.get(market_slug)
+        if hint is None and self.cache is not None:
+            hint = self.cache.get("endpoint|" + self._cache_key(market_slug))
+        return hint
+
+    def _set_endpoint_hint(self, market_slug: str, endpoint: str) -> None:
+        """Remember which endpoint served a slug (stored only when it changes the default order)."""
+        hint = self._get_endpoint_hint(market_slug)
+        if hint == endpoint or (hint is None and endpoint == 'event'):
+            return
+        self._endpoint_hints[market_slug] = endpoint
+        if self.cache is not None:
+            self.cache.set("endpoint|" + self._cache_key(market_slug), endpoint, ttl_ms=ENDPOINT_HINT_TTL_MS)
+
+    def get_market_data(self, market_slug: str, force_refresh: bool = False) -> Optional[Dict]:
+        """
+        Fetch comprehensive market data, serving repeat lookups from the local cache.
+
+        Args:
+            market_slug: Polymarket market slug
+            force_refresh: Skip the cache and always query the API
+        """
+        if not force_refresh:
+            state, cached = self._cache_lookup(market_slug)
+            if state != "MISS":
+                return cached
+
+        data = self._fetch_market_data(market_slug)
+        self._cache_set(market_slug, data)
+        return data
 
-    def get_market_data(self, market_slug: str) -> Optional[Dict]:
+    def _fetch_market_data(self, market_slug: str) -> Optional[Dict]:
         """
         Fetch comprehensive market data from Polymarket API.
         
@@ -126,43 +462,249 @@ class MarketAnalyzer:
         
         Reference: https://docs.polymarket.com/developers/gamma-markets-api/fetch-markets-guide
         """
-        # Try events endpoint first (most markets are events)
-        event_url = f"{self.base_url}/events/slug/{market_slug}"
-        market_url = f"{self.base_url}/markets/slug/{market_slug}"
+        urls = {
+            'event': f"{self.base_url}/events/slug/{market_slug}",
+            'market': f"{self.base_url}/markets/slug/{market_slug}",
+        }
+        # Try events endpoint first (most markets are events), unless this slug
+        # was served by the markets endpoint before - then that saves a round trip
+        if self._get_endpoint_hint(market_slug) == 'market':
+            order = ('market', 'event')
+        else:
+            order = ('event', 'market')
         
         try:
-            # Try events endpoint first
-            response = self.session.get(event_url, timeout=10)
-            if response.status_code == 200:
-                event_data = response.json()
-                # Events contain markets, so extract the first market if available
-                if isinstance(event_data, dict):
-                    # If event has markets array, return the event with first market
-                    if 'markets' in event_data and isinstance(event_data['markets'], list) and len(event_data['markets']) > 0:
-                        # Merge event data with market data
-                        market_data = event_data['markets'][0]
-                        market_data.update({
-                            'event_id': event_data.get('id'),
-                            'event_slug': event_data.get('slug'),
-                            'event_question': event_data.get('question')
-                        })
-                        return market_data
-                    # If no markets array, return event data as-is
-                    return event_data
-                return event_data
-            
-            # If event endpoint fails, try markets endpoint
-            response = self.session.get(market_url, timeout=10)
-            if response.status_code == 200:
-                return response.json()
+            statuses = []
+            for endpoint in order:
+                response = self.session.get(urls[endpoint], timeout=10)
+                # Don't buffer/decode proxy or CDN error pages served with 200
+                if response.status_code == 200 and _is_json_content_type(response.headers.get('Content-Type')):
+                    self._set_endpoint_hint(market_slug, endpoint)
+                    data = _json_loads(response.content)
+                    return self._event_to_market(data) if endpoint == 'event' else data
+                statuses.append(response.status_code)
             
-            # If both fail, return None
+            # If both fail, return None (and don't ask again for a while if unknown)
+            if statuses == [404, 404]:
+                self._mark_not_found(market_slug)
             return None
             
         except Exception as e:
             print(f"Error fetching market data for {market_slug}: {e}")
             return None
 
+    def get_markets_bulk(self, market_slugs: List[str], batch_size: int = 50) -> Dict[str, Dict]:
+        """
+        Fetch many markets in as few requests as possible.
+
+        Uses the Gamma list endpoint (GET /markets?slug=a&slug=b...), which
+        returns every requested market in one response, so N slugs cost
+        ceil(N / batch_size) round trips instead of N.
+
+        Returns:
+            Market payloads keyed by slug. Slugs the list endpoint does not
+            know (e.g. event slugs) are simply absent from the result. With
+            ijson installed each payload is trimmed to _MARKET_KEYS, so these
+            are not the full objects get_market_data returns.
+        """
+        wanted = list(dict.fromkeys(market_slugs))
+        found: Dict[str, Dict] = {}
+        for i in range(0, len(wanted), batch_size):
+            chunk = wanted[i:i + batch_size]
+            params = [("slug", slug) for slug in chunk]
+            params.append(("limit", str(len(chunk))))
+            try:
+                with self.session.get(
+                    f"{self.base_url}/markets", params=params, timeout=10, stream=True
+                ) as response:
+                    if response.status_code != 200 or not _is_json_content_type(
+                        response.headers.get('Content-Type')
+                    ):
+                        continue
+                    for market in self._iter_markets(response):
+                        if isinstance(market, dict) and market.get('slug') in chunk:
+                            found[market['slug']] = market
+            except Exception as e:
+                # Markets decoded before the failure are kept; the rest fall back
+                print(f"Error bulk-fetching {len(chunk)} markets: {e}")
+        return found
+
+    @staticmethod
+    def _iter_markets(response) -> Iterator[Dict]:
+        """
+        Yield the markets of a streamed /markets list response.
+
+        With ijson installed the body is decoded incrementally, so only one
+        market is held at a time and each is trimmed to _MARKET_KEYS;
+        otherwise the whole body is decoded at once.
+        """
+        if ijson is None:
+            markets = _json_loads(response.content)
+            if isinstance(markets, list):
+                yield from markets
+            return
+        # Let urllib3 undo any gzip/deflate Content-Encoding on the raw stream
+        response.raw.decode_content = True
+        for market in ijson.items(response.raw, 'item', use_float=True):
+            if isinstance(market, dict):
+                yield {key: value for key, value in market.items() if key in _MARKET_KEYS}
+
+    @staticmethod
+    def _event_to_market(event_data):
+        """Flatten an events-endpoint payload into its first market, tagged with event info."""
+        # Events contain markets, so extract the first market if available
+        if isinstance(event_data, dict):
+            # If event has markets array, return the event with first market
+            if 'markets' in event_data and isinstance(event_data['markets'], list) and len(event_data['markets']) > 0:
+                # Merge event data with market data
+                market_data = event_data['markets'][0]
+                market_data.update({
+                    'event_id': event_data.get('id'),
+                    'event_slug': event_data.get('slug'),
+                    'event_question': event_data.get('question')
+                })
+                return market_data
+            # If no markets array, return event data as-is
+            return event_data
+        return event_data
+
+    async def _get_market_data_async(
+        self, session, market_slug: str, semaphore: Optional[asyncio.Semaphore] = None
+    ) -> Optional[Dict]:
+        """
+        Async variant of get_market_data for batch analysis.
+
+        Races the events and markets endpoints and returns the first usable
+        payload, cancelling the other request, so a lookup costs
+        min(events, markets) latency. An event without a markets array only
+        counts if the markets endpoint has nothing either (as in
+        get_market_data). A slug with an endpoint hint is first asked of that
+        endpoint alone, racing both only if it has nothing usable. Requests
+        are throttled by semaphore if given.
+        """
+        timeout = aiohttp.ClientTimeout(total=10)
+        # Without a shared limit, a private semaphore simply admits both requests
+        semaphore = semaphore or asyncio.Semaphore(2)
+
+        not_found = set()
+
+        async def fetch(url):
+            async with semaphore:
+                async with session.get(url, timeout=timeout) as response:
+                    if response.status != 200:
+                        if response.status == 404:
+                            not_found.add(url)
+                        return None
+                    if not _is_json_content_type(response.headers.get('Content-Type')):
+                        return None
+                    return _json_loads(await response.read())
+
+        urls = {
+            'event': f"{self.base_url}/events/slug/{market_slug}",
+            'market': f"{self.base_url}/markets/slug/{market_slug}",
+        }
+        # A slug served before goes straight to that endpoint (one request, no race)
+        hint = self._get_endpoint_hint(market_slug)
+        if hint is not None:
+            try:
+                result = await fetch(urls[hint])
+            except Exception:
+                # Fall through to the race, which reports persistent errors
+                result = None
+            if hint == 'market' and result is not None:
+                return result
+            if hint == 'event' and isinstance(result, dict) and result.get('markets'):
+                return self._event_to_market(result)
+
+        event_task = asyncio.ensure_future(fetch(urls['event']))
+        market_task = asyncio.ensure_future(fetch(urls['market']))
+        pending = {event_task, market_task}
+        bare_event = None
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # Check the event result first so a simultaneous finish keeps the old preference
+                for task in (event_task, market_task):
+                    if task not in done:
+                        continue
+                    if task.exception() is not None:
+                        error = error or task.exception()
+                        continue
+                    result = task.result()
+                    if result is None:
+                        continue
+                    if task is market_task:
+                        self._set_endpoint_hint(market_slug, 'market')
+                        return result
+                    if isinstance(result, dict) and result.get('markets'):
+                        self._set_endpoint_hint(market_slug, 'event')
+                        return self._event_to_market(result)
+                    bare_event = result
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        if bare_event is not None:
+            self._set_endpoint_hint(market_slug, 'event')
+            return self._event_to_market(bare_event)
+        if error is not None:
+            print(f"Error fetching market data for {market_slug}: {error}")
+        elif len(not_found) == 2:
+            self._mark_not_found(market_slug)
+        return None
+
+    async def analyze_markets(
+        self, market_slugs: List[str], force_refresh: bool = False, workers: int = 16
+    ) -> List[MarketAnalysis]:
+        """
+        Analyze several markets with all network requests in flight at once.
+
+        Cached (and recently not-found) slugs are served locally; only cache
+        misses hit the network.
+        Uses aiohttp (at most `workers` requests in flight) when installed;
+        otherwise runs the blocking fetches on a pool of up to `workers`
+        threads sharing the session's connection pool.
+        """
+        now_utc = datetime.now(timezone.utc)
+        data_by_slug: Dict[str, Optional[Dict]] = {}
+        if not force_refresh:
+            for slug in market_slugs:
+                state, cached = self._cache_lookup(slug)
+                if state != "MISS":
+                    data_by_slug[slug] = cached
+
+        misses = [slug for slug in dict.fromkeys(market_slugs) if slug not in data_by_slug]
+        loop = asyncio.get_running_loop()
+        if len(misses) > 1:
+            # One list request covers every plain market slug; the rest
+            # (event slugs) fall through to the per-slug fetch below.
+            # Bulk items may be trimmed to _MARKET_KEYS, so they are used for
+            # this analysis only and never written to the per-slug cache.
+            bulk = await loop.run_in_executor(None, self.get_markets_bulk, misses)
+            data_by_slug.update(bulk)
+            misses = [slug for slug in misses if slug not in bulk]
+
+        if misses:
+            if aiohttp is None:
+                with ThreadPoolExecutor(max_workers=max(1, min(workers, len(misses)))) as executor:
+                    results = await asyncio.gather(*(
+                        loop.run_in_executor(executor, self._fetch_market_data, slug) for slug in misses
+                    ))
+            else:
+                semaphore = asyncio.Semaphore(workers)
+                connector = aiohttp.TCPConnector(limit=workers, ttl_dns_cache=300)
+                async with aiohttp.ClientSession(connector=connector) as session:
+                    results = await asyncio.gather(*(
+                        self._get_market_data_async(session, slug, semaphore) for slug in misses
+                    ))
+            for slug, data in zip(misses, results):
+                data_by_slug[slug] = data
+                self._cache_set(slug, data)
+
+        return [self._analysis_from_data(slug, data_by_slug[slug], now_utc) for slug in market_slugs]
+
     def get_recent_trades(self, asset_id: str, hours: int = 24) -> List[Dict]:
         """Get recent trades for price movement analysis."""
         # Note: Polymarket API may have rate limits
@@ -174,66 +716,54 @@ class MarketAnalyzer:
         except Exception:
             return []
 
-    def analyze_market(self, market_slug: str) -> MarketAnalysis:
-        """Perform comprehensive market analysis for PM4 compatibility."""
+    def analyze_market(
+        self, market_slug: str, now_utc: Optional[datetime] = None, force_refresh: bool = False
+    ) -> MarketAnalysis:
+        """Perform comprehensive market analysis for PM4 compatibility.
+
+        Args:
+            market_slug: Polymarket market slug
+            now_utc: Reference time for time-to-resolution (timezone-aware UTC).
+                     Batch callers pass one shared value; defaults to the current time.
+            force_refresh: Bypass the response cache and query the API
+        """
+        data = self.get_market_data(market_slug, force_refresh=force_refresh)
+        return self._analysis_from_data(market_slug, data, now_utc)
 
-        data = self.get_market_data(market_slug)
+    def _analysis_from_data(
+        self, market_slug: str, data: Optional[Dict], now_utc: Optional[datetime] = None
+    ) -> MarketAnalysis:
+        """Build a MarketAnalysis from an already-fetched Gamma API payload."""
         if not data:
-            return MarketAnalysis(
-                market_slug=market_slug,
-                condition_id="",
-                spread=0.0,
-                bestBid=0.0,
-                bestAsk=0.0,
-                liquidityClob=0.0,
-                liquidityAmm=0.0,
-                current_price=0.5,
-                volume24hr=0.0,
-                volume24hrClob=0.0,
-                volume24hrAmm=0.0,
-                last_trade_hours=999.0,  # No data available
-                time_to_resolution_days=0,
-                end_date=None,
-                start_date=None,
-                created_date=None,
-                volume_24h=0.0,
-                price_range_24h=(0.0, 1.0)
-            )
+            return replace(_EMPTY_ANALYSIS, market_slug=market_slug)
 
         # Extract basic market info
-        condition_id = data.get('conditionId', data.get('id', ''))
-        active_traders = int(data.get('activeUsers', data.get('uniqueTraders', 0)))
+        condition_id = _first(data, 'conditionId', 'id', default='')
+        active_traders = int(_first(data, 'activeUsers', 'uniqueTraders', default=0))
 
-        def safe_float(value, default=0.0):
-            """Safely convert to float with default."""
-            try:
-                return float(value) if value is not None else default
-            except (ValueError, TypeError):
-                return default
+        # Extract all numeric metrics in one pass over the field table
+        floats = _extract_floats(data)
 
         # Extract dates
         end_date = data.get('endDate', None)
         start_date = data.get('startDate', None)
-        created_date = data.get('createdAt', data.get('created_at', None))
+        created_date = _first(data, 'createdAt', 'created_at')
         
         # Calculate time to resolution
-        try:
-            if end_date:
-                end_date_dt = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
-                now = datetime.now(end_date_dt.tzinfo)
-                days_to_resolution = max(0, (end_date_dt - now).days)
-            else:
-                days_to_resolution = 365  # Default assumption
-        except Exception:
-            days_to_resolution = 365
+        end_date_dt = _parse_iso_datetime(end_date)
+        if end_date_dt is not None:
+            # Plain epoch arithmetic (naive dates are taken as local time)
+            now_s = time.time() if now_utc is None else now_utc.timestamp()
+            days_to_resolution = max(0, int((end_date_dt.timestamp() - now_s) // 86400))
+        else:
+            days_to_resolution = 365  # Default assumption (missing or invalid date)
 
-        # Extract order book metrics (most important for market making)
-        bestBid = safe_float(data.get('bestBid', 0))
-        bestAsk = safe_float(data.get('bestAsk', 0))
-        spread = safe_float(data.get('spread', 0))
+        # Order book metrics (most important for market making)
+        bestBid = floats['bestBid']
+        bestAsk = floats['bestAsk']
         # Calculate spread from bid/ask if not provided
-        if spread == 0 and bestBid > 0 and bestAsk > 0:
-            spread = bestAsk - bestBid
+        if floats['spread'] == 0 and bestBid > 0 and bestAsk > 0:
+            floats['spread'] = bestAsk - bestBid
 
         # Get current price (prefer mid price from bid/ask, then try API fields)
         current_price = 0.5  # Default
@@ -241,42 +771,16 @@ class MarketAnalyzer:
         if bestBid > 0 and bestAsk > 0:
             current_price = (bestBid + bestAsk) / 2.0
         else:
-            # Fall back to API price fields
-            try:
-                if 'outcomePrices' in data:
-                    prices = data.get('outcomePrices', [])
-                    if isinstance(prices, list) and len(prices) > 0:
-                        current_price = float(prices[0])
-                elif 'price' in data:
-                    current_price = float(data.get('price', 0.5))
-                elif 'yesPrice' in data:
-                    current_price = float(data.get('yesPrice', 0.5))
-            except (ValueError, TypeError, IndexError):
-                pass  # Keep default 0.5
-
-        # Extract liquidity (critical for market making)
-        liquidityClob = safe_float(data.get('liquidityClob', 0))
-        liquidityAmm = safe_float(data.get('liquidityAmm', 0))
-        
-        # Extract volume metrics
-        volume24hr = safe_float(data.get('volume24hr', data.get('volume24h', 0)))
-        volume1wk = safe_float(data.get('volume1wk', data.get('volume1w', 0)))
-        volume24hrAmm = safe_float(data.get('volume24hrAmm', data.get('volume24hAmm', 0)))
-        volume1wkAmm = safe_float(data.get('volume1wkAmm', data.get('volume1wAmm', 0)))
-        volume24hrClob = safe_float(data.get('volume24hrClob', data.get('volume24hClob', 0)))
-        volume1wkClob = safe_float(data.get('volume1wkClob', data.get('volume1wClob', 0)))
-        volumeAmm = safe_float(data.get('volumeAmm', 0))
-        volumeClob = safe_float(data.get('volumeClob', 0))
-        
-        # Extract price changes
-        oneDayPriceChange = safe_float(data.get('oneDayPriceChange', 0))
-        oneHourPriceChange = safe_float(data.get('oneHourPriceChange', 0))
-        oneWeekPriceChange = safe_float(data.get('oneWeekPriceChange', 0))
-        
-        # Extract liquidity rewards
-        rewardsMinSize = safe_float(data.get('rewardsMinSize', 0))
-        rewardsMaxSpread = safe_float(data.get('rewardsMaxSpread', 0))
-        
+            # Fall back to API price fields (invalid values keep the 0.5 default)
+            if 'outcomePrices' in data:
+                prices = data.get('outcomePrices', [])
+                if isinstance(prices, list) and len(prices) >= 1:
+                    current_price = _safe_float(prices[0], current_price)
+            elif 'price' in data:
+                current_price = _safe_float(data.get('price'), current_price)
+            elif 'yesPrice' in data:
+                current_price = _safe_float(data.get('yesPrice'), current_price)
+
         # Check recent activity
         # Note: Polymarket Gamma API doesn't provide lastTradeTimestamp
         # We can only infer activity from volume data
@@ -293,66 +797,49 @@ class MarketAnalyzer:
         else:
             # No timestamp available - infer from volume
             # If there's 24h volume, there was trading recently, but we don't know exactly when
-            if volume24hr > 0:
+            if floats['volume24hr'] > 0:
                 hours_since_trade = None  # Unknown but recent (within 24h)
             else:
                 hours_since_trade = 999  # No recent activity (no volume)
 
         # Legacy fields for compatibility
-        volume_24h = volume24hr
+        volume_24h = floats['volume24hr']
         price_range = (max(0.01, current_price - 0.1), min(0.99, current_price + 0.1))
         
-        # Extract token IDs from clobTokenIds array
-        token_id_yes = None
-        token_id_no = None
-        clob_token_ids = data.get('clobTokenIds', [])
-        
-        # Handle case where clobTokenIds might be a JSON string
-        if isinstance(clob_token_ids, str):
+        # Extract token IDs: clobTokenIds is [YES, NO] (possibly JSON-encoded);
+        # otherwise look them up by outcome in the tokens array
+        clob_token_ids = _maybe_json(data.get('clobTokenIds', []))
+        try:
+            token_id_yes, token_id_no = str(clob_token_ids[0]), str(clob_token_ids[1])
+        except (IndexError, KeyError, TypeError):
+            token_id_yes = token_id_no = None
             try:
-                import json
-                clob_token_ids = json.loads(clob_token_ids)
-            except (json.JSONDecodeError, ValueError):
-                clob_token_ids = []
-        
-        if isinstance(clob_token_ids, list) and len(clob_token_ids) >= 2:
-            # First token is typically YES, second is NO
-            token_id_yes = str(clob_token_ids[0])
-            token_id_no = str(clob_token_ids[1])
-        # Also check for tokens array if available
-        elif 'tokens' in data:
-            tokens = data['tokens']
-            # Handle JSON string
-            if isinstance(tokens, str):
-                try:
-                    import json
-                    tokens = json.loads(tokens)
-                except (json.JSONDecodeError, ValueError):
-                    tokens = []
-            if isinstance(tokens, list):
-                for token in tokens:
-                    if isinstance(token, dict):
-                        outcome = token.get('outcome', '').upper()
-                        token_id = token.get('token_id') or token.get('id')
-                        if outcome == 'YES' and token_id:
-                            token_id_yes = str(token_id)
-                        elif outcome == 'NO' and token_id:
-                            token_id_no = str(token_id)
+                for token in _maybe_json(data.get('tokens', [])):
+                    if not isinstance(token, dict):
+                        continue
+                    token_id = token.get('token_id') or token.get('id')
+                    if not token_id:
+                        continue
+                    outcome = token.get('outcome', '')
+                    # Known spellings skip the .upper() allocation
+                    side = _OUTCOME_SIDES.get(outcome) or str(outcome).upper()
+                    if side == 'YES':
+                        token_id_yes = str(token_id)
+                    elif side == 'NO':
+                        token_id_no = str(token_id)
+                    # Binary markets: stop once both sides are known
+                    if token_id_yes and token_id_no:
+                        break
+            except TypeError:
+                pass
 
         return MarketAnalysis(
             market_slug=market_slug,
             condition_id=condition_id,
-            # Core market making metrics
-            spread=spread,
-            bestBid=bestBid,
-            bestAsk=bestAsk,
-            liquidityClob=liquidityClob,
-            liquidityAmm=liquidityAmm,
+            # Numeric metrics from the field table (order book, liquidity, volume, ...)
+            **floats,
             current_price=current_price,
             # Activity metrics
-            volume24hr=volume24hr,
-            volume24hrClob=volume24hrClob,
-            volume24hrAmm=volume24hrAmm,
             last_trade_hours=hours_since_trade,
             # Market structure
             time_to_resolution_days=days_to_resolution,
@@ -360,17 +847,7 @@ class MarketAnalyzer:
             start_date=start_date,
             created_date=created_date,
             # Extended metrics
-            volume1wk=volume1wk,
-            volume1wkAmm=volume1wkAmm,
-            volume1wkClob=volume1wkClob,
-            volumeAmm=volumeAmm,
-            volumeClob=volumeClob,
             active_traders=active_traders,
-            oneHourPriceChange=oneHourPriceChange,
-            oneDayPriceChange=oneDayPriceChange,
-            oneWeekPriceChange=oneWeekPriceChange,
-            rewardsMinSize=rewardsMinSize,
-            rewardsMaxSpread=rewardsMaxSpread,
             token_id_yes=token_id_yes,
             token_id_no=token_id_no,
             # Legacy fields
@@ -378,208 +855,180 @@ class MarketAnalyzer:
             price_range_24h=price_range
         )
 
+    def analyze_many(
+        self, market_slugs: List[str], force_refresh: bool = False, workers: int = 16
+    ) -> List[MarketAnalysis]:
+        """Synchronous wrapper around analyze_markets for CLI use."""
+        return asyncio.run(self.analyze_markets(market_slugs, force_refresh=force_refresh, workers=workers))
+
     def print_analysis_report(self, analysis: MarketAnalysis) -> None:
         """Print factual market status report with definitions and context."""
-        
-        print(f"\n{'='*70}")
-        print(f"MARKET STATUS REPORT: {analysis.market_slug}")
-        print(f"{'='*70}")
-        print(f"Condition ID: {analysis.condition_id}")
-        if analysis.start_date:
-            print(f"Start Date: {analysis.start_date}")
-        if analysis.end_date:
-            print(f"End Date: {analysis.end_date}")
-        
-        # ===== DEFINITIONS =====
-        print(f"\n{'─'*70}")
-        print("DEFINITIONS")
-        print(f"{'─'*70}")
-        print("Spread: Difference between best ask and best bid prices.")
-        print("        Lower spread = tighter market = easier to profit from market making.")
-        print("        Typical range: 0.5-5% (0.005-0.05 in probability space).")
-        print()
-        print("Liquidity: Available capital in order book (CLOB) or AMM pool.")
-        print("          Higher liquidity = easier to enter/exit positions without slippage.")
-        print("          Typical range: $1k-$100k+ for active markets.")
-        print()
-        print("Volume: Total trading activity over time period.")
-        print("       Higher volume = more opportunities to capture spread.")
-        print("       Typical range: $10k-$500k+ per day for active markets.")
-        print()
-        print("CLOB: Central Limit Order Book - traditional exchange with limit orders.")
-        print("AMM: Automated Market Maker - liquidity pool with constant product formula.")
-        print()
-        
-        # ===== CORE MARKET MAKING METRICS (Most Important) =====
-        print(f"{'─'*70}")
-        print("CORE MARKET MAKING METRICS")
-        print(f"{'─'*70}")
-        
+        sys.stdout.write(self._build_report(analysis))
+
+    def _build_report(self, analysis: MarketAnalysis) -> str:
+        """Render the market status report (newline-terminated) via _REPORT_TEMPLATE."""
+        a = analysis
+
+        header_dates = ""
+        if a.start_date:
+            header_dates += f"Start Date: {a.start_date}\n"
+        if a.end_date:
+            header_dates += f"End Date: {a.end_date}\n"
+
         # Spread (most important)
-        if analysis.bestBid > 0 and analysis.bestAsk > 0:
-            print(f"Order Book:")
-            print(f"  Best Bid:  {analysis.bestBid:.4f} ({analysis.bestBid*100:.2f}%)")
-            print(f"  Best Ask:  {analysis.bestAsk:.4f} ({analysis.bestAsk*100:.2f}%)")
-            print(f"  Spread:    {analysis.spread:.4f} ({analysis.spread*100:.2f}%)")
-            if analysis.spread > 0:
-                if analysis.spread < 0.01:
-                    print(f"  Context:   Very tight spread (typical: 0.5-2%)")
-                elif analysis.spread < 0.03:
-                    print(f"  Context:   Moderate spread (typical: 0.5-2%)")
-                elif analysis.spread < 0.05:
-                    print(f"  Context:   Wide spread (typical: 0.5-2%)")
+        if a.bestBid > 0 and a.bestAsk > 0:
+            order_book = (
+                "Order Book:\n"
+                f"  Best Bid:  {a.bestBid:.4f} ({a.bestBid*100:.2f}%)\n"
+                f"  Best Ask:  {a.bestAsk:.4f} ({a.bestAsk*100:.2f}%)\n"
+                f"  Spread:    {a.spread:.4f} ({a.spread*100:.2f}%)\n"
+            )
+            if a.spread > 0:
+                if a.spread < 0.01:
+                    order_book += "  Context:   Very tight spread (typical: 0.5-2%)\n"
+                elif a.spread < 0.03:
+                    order_book += "  Context:   Moderate spread (typical: 0.5-2%)\n"
+                elif a.spread < 0.05:
+                    order_book += "  Context:   Wide spread (typical: 0.5-2%)\n"
                 else:
-                    print(f"  Context:   Very wide spread (typical: 0.5-2%)")
+                    order_book += "  Context:   Very wide spread (typical: 0.5-2%)\n"
         else:
-            print(f"Order Book: No data available")
-        
-        print()
-        
+            order_book = "Order Book: No data available\n"
+
         # Liquidity
-        total_liquidity = analysis.liquidityClob + analysis.liquidityAmm
+        total_liquidity = a.liquidityClob + a.liquidityAmm
         if total_liquidity > 0:
-            print(f"Liquidity:")
-            if analysis.liquidityClob > 0:
-                print(f"  CLOB: ${analysis.liquidityClob:,.0f}")
-            if analysis.liquidityAmm > 0:
-                print(f"  AMM:  ${analysis.liquidityAmm:,.0f}")
-            print(f"  Total: ${total_liquidity:,.0f}")
+            liquidity = "Liquidity:\n"
+            if a.liquidityClob > 0:
+                liquidity += f"  CLOB: ${a.liquidityClob:,.0f}\n"
+            if a.liquidityAmm > 0:
+                liquidity += f"  AMM:  ${a.liquidityAmm:,.0f}\n"
+            liquidity += f"  Total: ${total_liquidity:,.0f}\n"
             if total_liquidity < 1000:
-                print(f"  Context: Low liquidity (typical: $1k-$100k+)")
+                liquidity += "  Context: Low liquidity (typical: $1k-$100k+)\n"
             elif total_liquidity < 10000:
-                print(f"  Context: Moderate liquidity (typical: $1k-$100k+)")
+                liquidity += "  Context: Moderate liquidity (typical: $1k-$100k+)\n"
             else:
-                print(f"  Context: High liquidity (typical: $1k-$100k+)")
+                liquidity += "  Context: High liquidity (typical: $1k-$100k+)\n"
         else:
-            print(f"Liquidity: No data available")
-        
-        print()
-        
+            liquidity = "Liquidity: No data available\n"
+
         # Current price
-        print(f"Current Price: {analysis.current_price:.4f} ({analysis.current_price*100:.2f}%)")
-        if analysis.current_price < 0.1:
-            print(f"  Context: Low extreme (<10%) - limited upward price movement room")
-        elif analysis.current_price > 0.9:
-            print(f"  Context: High extreme (>90%) - limited downward price movement room")
-        elif analysis.current_price < 0.2:
-            print(f"  Context: Near low extreme (10-20%) - reduced upward movement room")
-        elif analysis.current_price > 0.8:
-            print(f"  Context: Near high extreme (80-90%) - reduced downward movement room")
+        if a.current_price < 0.1:
+            price_context = "Low extreme (<10%) - limited upward price movement room"
+        elif a.current_price > 0.9:
+            price_context = "High extreme (>90%) - limited downward price movement room"
+        elif a.current_price < 0.2:
+            price_context = "Near low extreme (10-20%) - reduced upward movement room"
+        elif a.current_price > 0.8:
+            price_context = "Near high extreme (80-90%) - reduced downward movement room"
         else:
-            print(f"  Context: Mid-range price (20-80%) - typical for market making")
-        
-        print()
-        
-        # ===== ACTIVITY METRICS =====
-        print(f"{'─'*70}")
-        print("ACTIVITY METRICS")
-        print(f"{'─'*70}")
-        
+            price_context = "Mid-range price (20-80%) - typical for market making"
+
         # Volume metrics
-        if analysis.volume24hr > 0:
-            print(f"24h Volume:")
-            print(f"  Total: ${analysis.volume24hr:,.0f}")
-            if analysis.volume24hrClob > 0:
-                print(f"  CLOB: ${analysis.volume24hrClob:,.0f} ({analysis.volume24hrClob/analysis.volume24hr*100:.1f}%)")
-            if analysis.volume24hrAmm > 0:
-                print(f"  AMM:  ${analysis.volume24hrAmm:,.0f} ({analysis.volume24hrAmm/analysis.volume24hr*100:.1f}%)")
-            
-            if analysis.volume24hr < 10000:
-                print(f"  Context: Low volume (typical: $10k-$500k+ per day)")
-            elif analysis.volume24hr < 50000:
-                print(f"  Context: Moderate volume (typical: $10k-$500k+ per day)")
+        if a.volume24hr > 0:
+            volume = f"24h Volume:\n  Total: ${a.volume24hr:,.0f}\n"
+            if a.volume24hrClob > 0:
+                volume += f"  CLOB: ${a.volume24hrClob:,.0f} ({a.volume24hrClob/a.volume24hr*100:.1f}%)\n"
+            if a.volume24hrAmm > 0:
+                volume += f"  AMM:  ${a.volume24hrAmm:,.0f} ({a.volume24hrAmm/a.volume24hr*100:.1f}%)\n"
+            if a.volume24hr < 10000:
+                volume += "  Context: Low volume (typical: $10k-$500k+ per day)\n"
+            elif a.volume24hr < 50000:
+                volume += "  Context: Moderate volume (typical: $10k-$500k+ per day)\n"
             else:
-                print(f"  Context: High volume (typical: $10k-$500k+ per day)")
+                volume += "  Context: High volume (typical: $10k-$500k+ per day)\n"
         else:
-            print(f"24h Volume: No data available")
-        
-        if analysis.volume1wk > 0:
-            print(f"1 Week Volume: ${analysis.volume1wk:,.0f}")
-        
-        print()
-        
+            volume = "24h Volume: No data available\n"
+        if a.volume1wk > 0:
+            volume += f"1 Week Volume: ${a.volume1wk:,.0f}\n"
+
         # Price changes
-        if analysis.oneHourPriceChange != 0 or analysis.oneDayPriceChange != 0 or analysis.oneWeekPriceChange != 0:
-            print(f"Price Changes:")
-            if analysis.oneHourPriceChange != 0:
-                print(f"  1 Hour:  {analysis.oneHourPriceChange*100:+.2f}%")
-            if analysis.oneDayPriceChange != 0:
-                print(f"  1 Day:   {analysis.oneDayPriceChange*100:+.2f}%")
-            if analysis.oneWeekPriceChange != 0:
-                print(f"  1 Week:  {analysis.oneWeekPriceChange*100:+.2f}%")
-            print()
-        
+        price_changes = ""
+        if a.oneHourPriceChange != 0 or a.oneDayPriceChange != 0 or a.oneWeekPriceChange != 0:
+            price_changes = "Price Changes:\n"
+            if a.oneHourPriceChange != 0:
+                price_changes += f"  1 Hour:  {a.oneHourPriceChange*100:+.2f}%\n"
+            if a.oneDayPriceChange != 0:
+                price_changes += f"  1 Day:   {a.oneDayPriceChange*100:+.2f}%\n"
+            if a.oneWeekPriceChange != 0:
+                price_changes += f"  1 Week:  {a.oneWeekPriceChange*100:+.2f}%\n"
+            price_changes += "\n"
+
         # Additional activity indicators
-        if analysis.active_traders > 0:
-            print(f"Active Traders: {analysis.active_traders}")
-            print()
-        
+        traders = f"Active Traders: {a.active_traders}\n\n" if a.active_traders > 0 else ""
+
         # Liquidity rewards (if available)
-        if analysis.rewardsMinSize > 0:
-            print(f"Liquidity Rewards:")
-            print(f"  Min Size: ${analysis.rewardsMinSize:,.0f}")
-            if analysis.rewardsMaxSpread > 0:
-                print(f"  Max Spread: {analysis.rewardsMaxSpread:.2f}%")
-            print()
-        
-        # ===== MARKET STRUCTURE =====
-        print(f"{'─'*70}")
-        print("MARKET STRUCTURE")
-        print(f"{'─'*70}")
-        
+        rewards = ""
+        if a.rewardsMinSize > 0:
+            rewards = f"Liquidity Rewards:\n  Min Size: ${a.rewardsMinSize:,.0f}\n"
+            if a.rewardsMaxSpread > 0:
+                rewards += f"  Max Spread: {a.rewardsMaxSpread:.2f}%\n"
+            rewards += "\n"
+
         # Market creation date
-        if analysis.created_date:
-            try:
-                created_dt = datetime.fromisoformat(analysis.created_date.replace('Z', '+00:00'))
-                now = datetime.now(created_dt.tzinfo)
-                days_since_creation = (now - created_dt).days
-                print(f"Created: {analysis.created_date[:10]} ({days_since_creation} days ago)")
-            except Exception:
-                print(f"Created: {analysis.created_date}")
-        
+        created = ""
+        if a.created_date:
+            created_dt = _parse_iso_datetime(a.created_date)
+            if created_dt is not None:
+                days_since_creation = int((time.time() - created_dt.timestamp()) // 86400)
+                created = f"Created: {a.created_date[:10]} ({days_since_creation} days ago)\n"
+            else:
+                created = f"Created: {a.created_date}\n"
+
         # Start and end dates
-        if analysis.start_date:
-            print(f"Start Date: {analysis.start_date[:10] if len(analysis.start_date) > 10 else analysis.start_date}")
-        if analysis.end_date:
-            print(f"End Date: {analysis.end_date[:10] if len(analysis.end_date) > 10 else analysis.end_date}")
-        
-        print(f"Time to Resolution: {analysis.time_to_resolution_days} days")
-        if analysis.time_to_resolution_days < 7:
-            print(f"  Context: Short horizon - limited trading window")
-        elif analysis.time_to_resolution_days < 30:
-            print(f"  Context: Medium horizon (typical: 30+ days preferred)")
+        structure_dates = ""
+        if a.start_date:
+            structure_dates += f"Start Date: {a.start_date[:10]}\n"
+        if a.end_date:
+            structure_dates += f"End Date: {a.end_date[:10]}\n"
+
+        if a.time_to_resolution_days < 7:
+            horizon_context = "Short horizon - limited trading window"
+        elif a.time_to_resolution_days < 30:
+            horizon_context = "Medium horizon (typical: 30+ days preferred)"
         else:
-            print(f"  Context: Long horizon - extended trading opportunity")
-        
-        print()
-        
-        # ===== TECHNICAL DETAILS =====
-        if analysis.token_id_yes or analysis.token_id_no:
-            print(f"{'─'*70}")
-            print("TECHNICAL DETAILS")
-            print(f"{'─'*70}")
-            if analysis.token_id_yes:
-                print(f"YES Token ID: {analysis.token_id_yes}")
-            if analysis.token_id_no:
-                print(f"NO Token ID: {analysis.token_id_no}")
-            print()
-        
-        print(f"{'='*70}\n")
+            horizon_context = "Long horizon - extended trading opportunity"
+
+        technical = ""
+        if a.token_id_yes or a.token_id_no:
+            technical = _TECHNICAL_HEADER
+            if a.token_id_yes:
+                technical += f"YES Token ID: {a.token_id_yes}\n"
+            if a.token_id_no:
+                technical += f"NO Token ID: {a.token_id_no}\n"
+            technical += "\n"
+
+        return _REPORT_TEMPLATE.format_map({
+            'market_slug': a.market_slug,
+            'condition_id': a.condition_id,
+            'header_dates': header_dates,
+            'order_book': order_book,
+            'liquidity': liquidity,
+            'current_price': a.current_price,
+            'current_price_pct': a.current_price * 100,
+            'price_context': price_context,
+            'volume': volume,
+            'price_changes': price_changes,
+            'traders': traders,
+            'rewards': rewards,
+            'created': created,
+            'structure_dates': structure_dates,
+            'time_to_resolution_days': a.time_to_resolution_days,
+            'horizon_context': horizon_context,
+            'technical': technical,
+        })
 
 
 def main():
     """Command-line interface for market analysis."""
-    import argparse
-    import os
-    import sys
-    from io import StringIO
-
     parser = argparse.ArgumentParser(
         description="Analyze Polymarket for PM4 trading suitability"
     )
     parser.add_argument(
         "market_input",
-        help="Polymarket market URL or slug (e.g., 'https://polymarket.com/market/will-ethereum-reach-10k-before-2025' or 'will-ethereum-reach-10k-before-2025')"
+        nargs="+",
+        help="One or more Polymarket market URLs or slugs (e.g., 'https://polymarket.com/market/will-ethereum-reach-10k-before-2025' or 'will-ethereum-reach-10k-before-2025'); several markets are fetched concurrently"
     )
     parser.add_argument(
         "--output", "-o",
@@ -587,32 +1036,31 @@ def main():
         type=str,
         default=None
     )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Ignore cached API responses and fetch fresh market data"
+    )
 
     args = parser.parse_args()
 
-    # Extract market slug from URL or use slug directly
+    # Extract market slugs from URLs or use slugs directly
+    market_slugs = []
     try:
-        market_slug = extract_market_slug(args.market_input)
-        print(f"Analyzing market: {market_slug}")
+        for market_input in args.market_input:
+            market_slugs.append(extract_market_slug(market_input))
+            print(f"Analyzing market: {market_slugs[-1]}")
         print("-" * 50)
     except ValueError as e:
         print(f"Error: {e}")
         return
 
     analyzer = MarketAnalyzer()
-    analysis = analyzer.analyze_market(market_slug)
+    analyses = analyzer.analyze_many(market_slugs, force_refresh=args.refresh)
     
-    # If output file specified, capture output and save to file
+    # If output file specified, render once and save to file
     if args.output:
-        # Capture stdout
-        old_stdout = sys.stdout
-        sys.stdout = captured_output = StringIO()
-        
-        try:
-            analyzer.print_analysis_report(analysis)
-            report_content = captured_output.getvalue()
-        finally:
-            sys.stdout = old_stdout
+        report_content = "".join(analyzer._build_report(analysis) for analysis in analyses)
         
         # Save to file
         output_path = args.output
@@ -621,15 +1069,17 @@ def main():
             os.makedirs("data/temp", exist_ok=True)
             output_path = os.path.join("data/temp", output_path)
         
-        with open(output_path, 'w') as f:
+        # Report uses box-drawing characters; don't depend on the locale's encoding
+        with open(output_path, 'w', encoding='utf-8') as f:
             f.write(report_content)
         
         print(f"✓ Report saved to: {output_path}")
-        # Also print to console
+        # Also print to console (same rendered string, no second render or copy)
         print(report_content)
     else:
         # Print to console only
-        analyzer.print_analysis_report(analysis)
+        for analysis in analyses:
+            analyzer.print_analysis_report(analysis)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,107 @@
+"""
+On-disk TTL cache for Polymarket API responses.
+
+Repeated market analyses during dry-run iteration hit the Gamma API for the
+same slugs over and over. FileCache stores each response as a small JSON file
+so a repeat lookup within the TTL is a local file read instead of an HTTPS
+round trip (and does not count against API rate limits).
+
+Cache Entry Format:
+    ~/.pm4/cache/markets/{md5(key)}.json
+    {"fetched_ms": 1703123456789, "ttl_ms": 60000, "data": {...}}
+
+Usage:
+    cache = FileCache()
+    data = cache.get("will-eth-reach-10k")
+    if data is None:
+        data = fetch_from_api()
+        cache.set("will-eth-reach-10k", data)
+"""
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any, Optional
+
+from .utils import now_ms
+
+# Optional: orjson (de)serializes entries several times faster than stdlib json.
+# Its errors subclass ValueError/TypeError, so the handlers below cover both.
+try:
+    import orjson
+
+    def _dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+    _loads = json.loads
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".pm4", "cache", "markets")
+
+
+class FileCache:
+    """JSON file cache with per-entry time-to-live.
+
+    Cache failures (unreadable, corrupt or unwritable files) are treated as
+    misses and never raised - the caller simply falls back to the network.
+
+    Args:
+        cache_dir: Directory holding cache entries (created on first write)
+        ttl_ms: Default time-to-live for new entries in milliseconds
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, ttl_ms: int = 60_000):
+        self.cache_dir = cache_dir
+        self.ttl_ms = ttl_ms
+
+    def _path(self, key: str) -> str:
+        """Map a cache key to its entry file (hashed so any slug is a safe filename)."""
+        digest = hashlib.md5(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def get(self, key: str, ttl_ms: Optional[int] = None) -> Optional[Any]:
+        """Return cached data for key, or None if missing or expired.
+
+        Args:
+            key: Cache key (e.g. market slug)
+            ttl_ms: Maximum acceptable age; defaults to the TTL stored with the entry
+        """
+        try:
+            with open(self._path(key), "rb") as fp:
+                entry = _loads(fp.read())
+            max_age = entry["ttl_ms"] if ttl_ms is None else ttl_ms
+            if now_ms() - entry["fetched_ms"] > max_age:
+                return None
+            return entry["data"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def set(self, key: str, data: Any, ttl_ms: Optional[int] = None) -> None:
+        """Store data under key, replacing any existing entry atomically."""
+        entry = {
+            "fetched_ms": now_ms(),
+            "ttl_ms": self.ttl_ms if ttl_ms is None else ttl_ms,
+            "data": data,
+        }
+        path = self._path(key)
+        tmp_path = None
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Unique temp name per writer, so concurrent threads and
+            # processes storing the same key never share a temp file
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as fp:
+                fp.write(_dumps(entry))
+            # Atomic rename so concurrent readers never see a partial file
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError):
+            # Caching is best-effort; never fail the caller's fetch
+            if tmp_path is not None:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
@@ -6,13 +6,27 @@ and generates the correct configuration format for config.json.
 """
 
 import argparse
+import functools
 import json
 import re
+import sys
+import threading
 from datetime import datetime
 from typing import Optional, Tuple, Dict, Any, List
 
-from .market_analyzer import MarketAnalyzer
-from .utils import date_to_timestamp, timestamp_to_date
+from .market_analyzer import MarketAnalysis, MarketAnalyzer
+from .market_analyzer import extract_market_slug as _parse_market_slug
+from .utils import date_to_timestamp, now_ms, parse_iso8601
+
+# Optional: orjson writes the indented config several times faster than stdlib json
+try:
+    import orjson
+
+    def _dumps_config(config: Dict[str, Any]) -> bytes:
+        return orjson.dumps(config, option=orjson.OPT_INDENT_2)
+except ImportError:
+    def _dumps_config(config: Dict[str, Any]) -> bytes:
+        return json.dumps(config, indent=2).encode("utf-8")
 
 
 # Parameter ranges based on PM4 documentation and recommendations
@@ -66,13 +80,30 @@ PARAMETER_RANGES: Dict[str, Dict[str, Tuple[float, float]]] = {
     },
 }
 
+# (section, param) -> range, so validation is a single dict lookup
+_FLAT_RANGES: Dict[Tuple[str, str], Tuple[float, float]] = {
+    (section, param): rng
+    for section, params in PARAMETER_RANGES.items()
+    for param, rng in params.items()
+}
+
+
+# Plain decimal numbers accepted for the interactive bankroll prompt (no inf/nan)
+_FLOAT_RE = re.compile(r'[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?\Z')
+
 
 def clamp_value(value: float, min_val: float, max_val: float) -> float:
     """Clamp a value to the specified range."""
     return max(min_val, min(max_val, value))
 
 
-def validate_parameter(section: str, param_name: str, value: Any, strict: bool = False) -> Any:
+def validate_parameter(
+    section: str,
+    param_name: str,
+    value: Any,
+    strict: bool = False,
+    warnings_out: Optional[List[str]] = None,
+) -> Any:
     """
     Validate a parameter value against its documented range.
     
@@ -81,6 +112,7 @@ def validate_parameter(section: str, param_name: str, value: Any, strict: bool =
         param_name: Parameter name
         value: Parameter value to validate
         strict: If True, raise ValueError on out-of-range. If False, clamp to range.
+        warnings_out: If given, clamp warnings are appended here instead of printed
     
     Returns:
         Validated (and potentially clamped) value
@@ -89,13 +121,11 @@ def validate_parameter(section: str, param_name: str, value: Any, strict: bool =
         ValueError: If strict=True and value is out of range
         KeyError: If section or param_name not found in ranges
     """
-    if section not in PARAMETER_RANGES:
-        return value
-    
-    if param_name not in PARAMETER_RANGES[section]:
+    rng = _FLAT_RANGES.get((section, param_name))
+    if rng is None:
         return value  # No validation defined for this parameter
     
-    min_val, max_val = PARAMETER_RANGES[section][param_name]
+    min_val, max_val = rng
     
     # Convert to float for comparison
     float_value = float(value)
@@ -111,8 +141,12 @@ def validate_parameter(section: str, param_name: str, value: Any, strict: bool =
         # Clamp to valid range
         clamped = clamp_value(float_value, min_val, max_val)
         if clamped != float_value:
-            print(f"Warning: {section}.{param_name} = {value} clamped to {clamped} "
-                  f"(valid range: [{min_val}, {max_val}])")
+            message = (f"Warning: {section}.{param_name} = {value} clamped to {clamped} "
+                       f"(valid range: [{min_val}, {max_val}])")
+            if warnings_out is not None:
+                warnings_out.append(message)
+            else:
+                print(message)
         # Return original type (int if it was int, float if it was float)
         if isinstance(value, int) and clamped == int(clamped):
             return int(clamped)
@@ -135,62 +169,169 @@ def validate_config(config: Dict[str, Any], strict: bool = False) -> Tuple[bool,
         ValueError: If strict=True and any parameter is out of range
     """
     warnings: List[str] = []
+    # Clamp messages are written in one go at the end instead of one print each
+    clamp_messages: List[str] = []
     
-    for section_name, section_ranges in PARAMETER_RANGES.items():
-        if section_name not in config:
+    for (section_name, param_name), (min_val, max_val) in _FLAT_RANGES.items():
+        section_config = config.get(section_name)
+        if section_config is None or param_name not in section_config:
             continue
+
+        original_value = section_config[param_name]
+        # Fast path: in-range numbers need no clamping, warning or type fix-up
+        if (isinstance(original_value, (int, float))
+                and min_val <= original_value <= max_val):
+            continue
+
+        try:
+            validated_value = validate_parameter(
+                section_name, param_name, original_value, strict=strict,
+                warnings_out=clamp_messages,
+            )
             
-        section_config = config[section_name]
-        
-        for param_name in section_ranges:
-            if param_name not in section_config:
-                continue
-            
-            try:
-                original_value = section_config[param_name]
-                validated_value = validate_parameter(
-                    section_name, param_name, original_value, strict=strict
-                )
-                
-                if validated_value != original_value:
-                    section_config[param_name] = validated_value
-                    if not strict:
-                        warnings.append(
-                            f"{section_name}.{param_name}: {original_value} -> {validated_value}"
-                        )
-                        
-            except ValueError as e:
-                if strict:
-                    raise
-                warnings.append(str(e))
-    
+            if validated_value != original_value:
+                section_config[param_name] = validated_value
+                if not strict:
+                    warnings.append(
+                        f"{section_name}.{param_name}: {original_value} -> {validated_value}"
+                    )
+                    
+        except ValueError as e:
+            if strict:
+                raise
+            warnings.append(str(e))
+
+    if clamp_messages:
+        sys.stdout.write("\n".join(clamp_messages) + "\n")
     return (len(warnings) == 0, warnings)
 
 
+@functools.lru_cache(maxsize=1024)
 def extract_market_slug(url: str) -> str:
-    """Extract market slug from Polymarket URL."""
-    # Handle various Polymarket URL formats
-    patterns = [
-        r'polymarket\.com/market/([^/?]+)',           # Standard market URLs
-        r'polymarket\.com/event/[^/]+/([^/?]+)',      # Event URLs: /event/event-id/market-slug
-        r'gamma\.polymarket\.com/market/([^/?]+)',    # Gamma market URLs
-        r'https?://[^/]+/market/([^/?]+)',            # Generic market URLs
-        r'https?://[^/]+/event/[^/]+/([^/?]+)'        # Generic event URLs
-    ]
+    """Extract market slug from Polymarket URL or slug (memoized; invalid input still raises).
+
+    Uses the analyzer's parser so both tools read any URL the same way.
+    """
+    if not url:
+        raise ValueError("Could not extract market slug from an empty URL")
+    return _parse_market_slug(url)
+
+
+# Analyses are reused across config generations for the same slug in one
+# process; the TTL keeps a long-running session from serving stale market data.
+ANALYSIS_CACHE_TTL_MS = 10 * 60 * 1000
+
+_analyzer: Optional[MarketAnalyzer] = None
+_analysis_cache: Dict[str, Tuple[int, MarketAnalysis]] = {}
+_analysis_lock = threading.Lock()
+
+
+def _get_analyzer() -> MarketAnalyzer:
+    """Return the shared MarketAnalyzer (one HTTP session per process)."""
+    global _analyzer
+    if _analyzer is None:
+        _analyzer = MarketAnalyzer()
+    return _analyzer
+
+
+def _cached_analyze(market_slug: str) -> MarketAnalysis:
+    """Analyze a market, reusing a result from the last ANALYSIS_CACHE_TTL_MS.
+
+    Empty analyses (no condition_id, e.g. after an API error) are not cached,
+    so the next call retries instead of hiding the market for the whole TTL.
+    """
+    now = now_ms()
+    with _analysis_lock:
+        cached = _analysis_cache.get(market_slug)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+
+    analysis = _get_analyzer().analyze_market(market_slug)
+    if analysis.condition_id:
+        with _analysis_lock:
+            _analysis_cache[market_slug] = (now + ANALYSIS_CACHE_TTL_MS, analysis)
+    return analysis
+
+
+def clear_analysis_cache() -> None:
+    """Drop all in-process market analyses (e.g. between tests)."""
+    with _analysis_lock:
+        _analysis_cache.clear()
 
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            return match.group(1)
 
-    raise ValueError(f"Could not extract market slug from URL: {url}")
+def _iso_to_ms(value: Optional[str], default_ms: int) -> int:
+    """Convert a Gamma API ISO-8601 date to epoch ms, or default_ms if unparseable."""
+    if not value:
+        return default_ms
+    try:
+        return int(parse_iso8601(value).timestamp() * 1000)
+    except (ValueError, TypeError):
+        return default_ms
+
+
+# Default parameters for a generated config (risk.bankroll_B is overridden per call)
+_BASE_CONFIG_TEMPLATE: Dict[str, Any] = {
+    "warmup": {
+        "dt_sample_s": 5.0,
+        "min_return_samples": 360,
+        "max_warmup_s": 7200,
+        "tau_fast_s": 30.0,
+        "tau_slow_s": 1800.0,
+        "markout_h1_s": 10.0,
+        "markout_h2_s": 60.0
+    },
+    "risk": {
+        "bankroll_B": 50.0,
+        "n_plays": 3,
+        "eta_time": 0.5,
+        "slippage_buffer": 0.05,
+        "gamma_a": 0.8,
+        "gamma_max": 8.0,
+        "lambda_min": 0.8,
+        "lambda_max": 2.0,
+        "beta_p": 0.7,
+        "alpha_U": 0.5,
+        "U_ref": 50.0,
+        "w_A": 1.0,
+        "w_L": 1.0,
+        "s_scale": 1.0,
+        "I_max": 3.0,
+        "c_tox": 1.0,
+        "c_sigma": 1.0,
+        "nu_sigma": 1.4,
+        "sigma_max": 6.0,
+        "sigma_tau_up_s": 10.0,
+        "sigma_tau_down_s": 90.0
+    },
+    "quote": {
+        "c_risk": 0.2,
+        "kappa0": 1.0,
+        "rate_ref_per_s": 0.05,
+        "min_half_spread_prob": 0.01,
+        "max_half_spread_logit": 1.5,
+        "ladder_decay": 0.8,
+        "ladder_step_mult": 0.5,
+        "ladder_min_step_logit": 0.05,
+        "ladder_max_levels": 5,
+        "min_order_size": 1.0,
+        "max_order_notional_side": 100.0,
+        "refresh_s": 2.0,
+        "price_move_requote_ticks": 1
+    },
+    "logging": {
+        "level": "DEBUG",
+        "enable_performance": True,
+        "enable_context_tracking": False
+    },
+    "log_path": "./data/logs/mm_events.jsonl",
+    "calib_path": "./data/calibration/warm_calibration.json"
+}
 
 
 def format_config_for_market(market_slug: str, custom_bankroll: Optional[float] = None) -> dict:
     """Generate config.json format for a specific market."""
 
-    analyzer = MarketAnalyzer()
-    analysis = analyzer.analyze_market(market_slug)
+    analysis = _cached_analyze(market_slug)
 
     if not analysis.condition_id:
         print(f"Warning: Could not fetch market data for {market_slug}")
@@ -208,25 +349,9 @@ def format_config_for_market(market_slug: str, custom_bankroll: Optional[float]
             }
         }
     else:
-        # Convert dates to timestamps
-        start_ts_ms = 1700000000000  # Default
-        resolve_ts_ms = 1735000000000  # Default
-        
-        if analysis.start_date:
-            try:
-                from datetime import datetime
-                start_dt = datetime.fromisoformat(analysis.start_date.replace('Z', '+00:00'))
-                start_ts_ms = int(start_dt.timestamp() * 1000)
-            except Exception:
-                pass
-        
-        if analysis.end_date:
-            try:
-                from datetime import datetime
-                end_dt = datetime.fromisoformat(analysis.end_date.replace('Z', '+00:00'))
-                resolve_ts_ms = int(end_dt.timestamp() * 1000)
-            except Exception:
-                pass
+        # Convert dates to timestamps, keeping the defaults if unparseable
+        start_ts_ms = _iso_to_ms(analysis.start_date, 1700000000000)
+        resolve_ts_ms = _iso_to_ms(analysis.end_date, 1735000000000)
         
         # Use token IDs from analysis if available, otherwise use placeholders
         asset_id_yes = analysis.token_id_yes if analysis.token_id_yes else "0x_YES_TOKEN_ID"
@@ -251,7 +376,8 @@ def format_config_for_market(market_slug: str, custom_bankroll: Optional[float]
         "active_traders": analysis.active_traders,
         "current_price": analysis.current_price,
         "recommendation": analysis.recommendation,
-        "analyzed_at": timestamp_to_date(int(datetime.now().timestamp() * 1000))
+        # Same local "YYYY-MM-DD HH:MM:SS" as timestamp_to_date, without the ms round-trip
+        "analyzed_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     }
 
     # Use custom bankroll if provided, otherwise use safe default
@@ -259,73 +385,19 @@ def format_config_for_market(market_slug: str, custom_bankroll: Optional[float]
     # Validate and clamp bankroll to valid range
     bankroll = validate_parameter("risk", "bankroll_B", bankroll, strict=False)
 
-    # Add the rest of the config with the bankroll
+    # Add the rest of the config with the bankroll. Sections are copied one
+    # level deep (all leaves are immutable) so callers can edit the result.
     base_config = {
-        "warmup": {
-            "dt_sample_s": 5.0,
-            "min_return_samples": 360,
-            "max_warmup_s": 7200,
-            "tau_fast_s": 30.0,
-            "tau_slow_s": 1800.0,
-            "markout_h1_s": 10.0,
-            "markout_h2_s": 60.0
-        },
-        "risk": {
-            "bankroll_B": bankroll,
-            "n_plays": 3,
-            "eta_time": 0.5,
-            "slippage_buffer": 0.05,
-            "gamma_a": 0.8,
-            "gamma_max": 8.0,
-            "lambda_min": 0.8,
-            "lambda_max": 2.0,
-            "beta_p": 0.7,
-            "alpha_U": 0.5,
-            "U_ref": 50.0,
-            "w_A": 1.0,
-            "w_L": 1.0,
-            "s_scale": 1.0,
-            "I_max": 3.0,
-            "c_tox": 1.0,
-            "c_sigma": 1.0,
-            "nu_sigma": 1.4,
-            "sigma_max": 6.0,
-            "sigma_tau_up_s": 10.0,
-            "sigma_tau_down_s": 90.0
-        },
-        "quote": {
-            "c_risk": 0.2,
-            "kappa0": 1.0,
-            "rate_ref_per_s": 0.05,
-            "min_half_spread_prob": 0.01,
-            "max_half_spread_logit": 1.5,
-            "ladder_decay": 0.8,
-            "ladder_step_mult": 0.5,
-            "ladder_min_step_logit": 0.05,
-            "ladder_max_levels": 5,
-            "min_order_size": 1.0,
-            "max_order_notional_side": 100.0,
-            "refresh_s": 2.0,
-            "price_move_requote_ticks": 1
-        },
-        "logging": {
-            "level": "DEBUG",
-            "enable_performance": True,
-            "enable_context_tracking": False
-        },
-        "log_path": "./data/logs/mm_events.jsonl",
-        "calib_path": "./data/calibration/warm_calibration.json"
+        key: (value.copy() if isinstance(value, dict) else value)
+        for key, value in _BASE_CONFIG_TEMPLATE.items()
     }
+    base_config["risk"]["bankroll_B"] = bankroll
 
     config.update(base_config)
-    
-    # Validate all parameters in the generated config
-    is_valid, warnings = validate_config(config, strict=False)
-    if warnings:
-        print("\n⚠️  Parameter validation warnings (values clamped to valid ranges):")
-        for warning in warnings:
-            print(f"  - {warning}")
-    
+
+    # No validate_config pass here: the template is authored in-range and the
+    # bankroll (the only user input) was validated above. Callers loading
+    # external configs should run validate_config themselves.
     return config
 
 
@@ -351,18 +423,18 @@ def interactive_config_setup():
         if not bankroll_input:
             bankroll = 50.0
             break
-        try:
-            bankroll = float(bankroll_input)
-            # Validate against range
-            try:
-                bankroll = validate_parameter("risk", "bankroll_B", bankroll, strict=True)
-                break
-            except ValueError as e:
-                print(f"✗ {e}")
-                min_val, max_val = PARAMETER_RANGES["risk"]["bankroll_B"]
-                print(f"  Valid range: ${min_val}-${max_val}")
-        except ValueError:
+        if not _FLOAT_RE.match(bankroll_input):
             print("✗ Please enter a valid number")
+            continue
+        bankroll = float(bankroll_input)
+        # Validate against range
+        try:
+            bankroll = validate_parameter("risk", "bankroll_B", bankroll, strict=True)
+            break
+        except ValueError as e:
+            print(f"✗ {e}")
+            min_val, max_val = PARAMETER_RANGES["risk"]["bankroll_B"]
+            print(f"  Valid range: ${min_val}-${max_val}")
 
     # Generate config
     print(f"\nAnalyzing market: {market_slug}")
@@ -370,29 +442,34 @@ def interactive_config_setup():
 
     # Show analysis
     analysis = config["_market_analysis"]
-    print("\nMarket Analysis:")
-    print(f"  Volume (24h): ${analysis['volume_24h']:,.0f}")
-    print(f"  Active Traders: {analysis['active_traders']}")
-    print(f"  Current Price: {analysis['current_price']:.3f}")
-    print(f"  Recommendation: {analysis['recommendation']}")
+    sys.stdout.write(
+        "\nMarket Analysis:\n"
+        f"  Volume (24h): ${analysis['volume_24h']:,.0f}\n"
+        f"  Active Traders: {analysis['active_traders']}\n"
+        f"  Current Price: {analysis['current_price']:.3f}\n"
+        f"  Recommendation: {analysis['recommendation']}\n"
+    )
 
     # Save config to temp directory
     import os
     os.makedirs("data/temp", exist_ok=True)
     output_file = "data/temp/config_generated.json"
-    with open(output_file, 'w') as f:
-        json.dump(config, f, indent=2)
-
-    print(f"\n✓ Configuration saved to: {output_file}")
-    print("\nNext steps:")
-    print("1. Edit the generated config file")
-    print("2. Fill in the asset IDs from Polymarket market page")
-    print("3. Set correct start_ts_ms and resolve_ts_ms dates")
-    print("4. Rename to config.json and run: python -m pm4.warmup config.json")
+    with open(output_file, 'wb') as f:
+        f.write(_dumps_config(config))
+
+    sys.stdout.write(
+        f"\n✓ Configuration saved to: {output_file}\n"
+        "\nNext steps:\n"
+        "1. Edit the generated config file\n"
+        "2. Fill in the asset IDs from Polymarket market page\n"
+        "3. Set correct start_ts_ms and resolve_ts_ms dates\n"
+        "4. Rename to config.json and run: python -m pm4.warmup config.json\n"
+    )
 
 
-def main():
-    """Command-line interface."""
+@functools.lru_cache(maxsize=1)
+def _parser() -> argparse.ArgumentParser:
+    """Build the command-line parser once per process."""
     parser = argparse.ArgumentParser(
         description="Generate PM4 config for Polymarket markets"
     )
@@ -428,7 +505,12 @@ def main():
         help="Strict validation mode (raise errors instead of clamping values)"
     )
 
-    args = parser.parse_args()
+    return parser
+
+
+def main():
+    """Command-line interface."""
+    args = _parser().parse_args()
 
     if args.interactive or not args.market_url:
         interactive_config_setup()
@@ -456,18 +538,20 @@ def main():
         return
 
     # Save to file
-    with open(args.output, 'w') as f:
-        json.dump(config, f, indent=2)
+    with open(args.output, 'wb') as f:
+        f.write(_dumps_config(config))
 
     print(f"✓ Configuration saved to: {args.output}")
 
     # Show summary
     analysis = config["_market_analysis"]
-    print("\nMarket Summary:")
-    print(f"  Volume: ${analysis['volume_24h']:,.0f}")
-    print(f"  Traders: {analysis['active_traders']}")
-    print(f"  Price: {analysis['current_price']:.3f}")
-    print(f"  Status: {analysis['recommendation']}")
+    sys.stdout.write(
+        "\nMarket Summary:\n"
+        f"  Volume: ${analysis['volume_24h']:,.0f}\n"
+        f"  Traders: {analysis['active_traders']}\n"
+        f"  Price: {analysis['current_price']:.3f}\n"
+        f"  Status: {analysis['recommendation']}\n"
+    )
 
 
 if __name__ == "__main__":
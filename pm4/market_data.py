@@ -23,15 +23,16 @@ Key Design Principles:
 The BookState maintains the current market snapshot while trade_ts provides
 activity analysis for liquidity assessment and risk management.
 """
+from bisect import bisect_left
 from collections import deque
 from dataclasses import dataclass
-from typing import Any, Deque, Dict, Optional
+from typing import Any, Callable, Deque, Dict, Optional
 
 from .logging import JsonlLogger
-from .utils import now_ms
+from .utils import DATACLASS_SLOTS, now_ms
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class BookState:
     """Real-time order book state for a prediction market.
 
@@ -90,7 +91,7 @@ class MarketData:
     - Trade rate calculations use snapshot semantics
     """
 
-    def __init__(self, logger: JsonlLogger):
+    def __init__(self, logger: JsonlLogger, trust_sorted: bool = True):
         """Initialize market data processor with logging.
 
         Sets up the core data structures for tracking market state and
@@ -100,6 +101,9 @@ class MarketData:
             logger: JsonlLogger instance for recording market data events
                    Used to persist order book updates, trades, and state changes
                    for analysis and debugging
+            trust_sorted: Take the first level of each book side as the best
+                   price (O(1)). Set False for feeds whose levels may arrive
+                   unsorted; on_book then scans every level for the best price.
 
         Data Structures:
             state: BookState dataclass maintaining current order book snapshot
@@ -108,9 +112,33 @@ class MarketData:
         """
         self.state = BookState()
         self.logger = logger
+        self.trust_sorted = trust_sorted
         # Maintain rolling history of trade timestamps for rate calculations
         # maxlen=5000 provides ~5 minutes of history at high frequency
         self.trade_ts: Deque[int] = deque(maxlen=5000)
+        # WS event_type -> bound handler, resolved once for handle()
+        self.handlers: Dict[str, Callable[[Dict[str, Any]], None]] = {
+            "book": self.on_book,
+            "price_change": self.on_price_change,
+            "tick_size_change": self.on_tick_size_change,
+            "last_trade_price": self.on_last_trade_price,
+        }
+
+    def handle(self, event_type: Optional[str], msg: Dict[str, Any]) -> bool:
+        """Route a WebSocket message to its handler.
+
+        Args:
+            event_type: Message "event_type" (or "type") field
+            msg: Parsed WebSocket message
+
+        Returns:
+            True if the message was handled, False for unknown event types
+        """
+        handler = self.handlers.get(event_type)
+        if handler is None:
+            return False
+        handler(msg)
+        return True
 
     def _update_mid(self):
         """Update midpoint price from current best bid/ask prices.
@@ -126,11 +154,12 @@ class MarketData:
         The midpoint represents the market's fair value estimate and is used by
         trading algorithms for positioning and volatility calculations.
         """
-        b, a = self.state.best_bid, self.state.best_ask
+        st = self.state
+        b, a = st.best_bid, st.best_ask
         # Validate price ranges and order book integrity before updating
         if b > 0 and a < 1 and b < a:
             # Standard midpoint calculation: average of best bid and ask
-            self.state.mid = 0.5 * (b + a)
+            st.mid = 0.5 * (b + a)
 
     def on_book(self, msg: Dict[str, Any]) -> None:
         """Process full order book snapshot from Polymarket WebSocket.
@@ -170,23 +199,33 @@ class MarketData:
         bids = msg.get("bids") or msg.get("buys") or []
         asks = msg.get("asks") or msg.get("sells") or []
 
+        st = self.state
         # Extract best prices from order book arrays
-        # bids[0] is highest bid price, asks[0] is lowest ask price
-        if bids:
-            self.state.best_bid = float(bids[0]["price"])
-        if asks:
-            self.state.best_ask = float(asks[0]["price"])
+        if self.trust_sorted:
+            # bids[0] is highest bid price, asks[0] is lowest ask price
+            if bids:
+                st.best_bid = float(bids[0]["price"])
+            if asks:
+                st.best_ask = float(asks[0]["price"])
+        else:
+            # Unknown ordering: scan all levels (max/min run as single C loops)
+            if bids:
+                st.best_bid = max([float(level["price"]) for level in bids])
+            if asks:
+                st.best_ask = min([float(level["price"]) for level in asks])
 
         # Update timestamp and recalculate derived metrics
-        self.state.last_book_ts_ms = int(msg.get("timestamp", now_ms()))
+        # (the clock is only read when the feed omits the timestamp)
+        ts = msg.get("timestamp")
+        st.last_book_ts_ms = now_ms() if ts is None else int(ts)
         self._update_mid()
 
         # Log significant order book state change
         self.logger.write("ws_book", {
-            "best_bid": self.state.best_bid,
-            "best_ask": self.state.best_ask,
-            "mid": self.state.mid,
-            "tick": self.state.tick_size
+            "best_bid": st.best_bid,
+            "best_ask": st.best_ask,
+            "mid": st.mid,
+            "tick": st.tick_size
         })
 
     def on_price_change(self, msg: Dict[str, Any]) -> None:
@@ -216,6 +255,7 @@ class MarketData:
         - Iterates through all price changes in the message
         - Updates best_bid/best_ask only when values are provided
         - Handles malformed data gracefully (skips invalid entries)
+        - Skips the midpoint update and log when no usable price arrived
         - Maintains data integrity even with network issues
 
         Args:
@@ -231,38 +271,60 @@ class MarketData:
         best_bid = None
         best_ask = None
 
-        for pc in pcs:
-            # Extract best bid if provided in this change
-            if pc.get("best_bid") is not None:
+        if len(pcs) == 1:
+            # Fast path: the feed almost always sends a single change per message
+            pc = pcs[0]
+            best_bid = pc.get("best_bid")
+            if best_bid is not None:
                 try:
-                    best_bid = float(pc["best_bid"])
+                    best_bid = float(best_bid)
                 except (ValueError, TypeError):
-                    # Skip malformed price data, continue with other updates
-                    pass
-
-            # Extract best ask if provided in this change
-            if pc.get("best_ask") is not None:
+                    best_bid = None  # Malformed price data, leave bid unchanged
+            best_ask = pc.get("best_ask")
+            if best_ask is not None:
                 try:
-                    best_ask = float(pc["best_ask"])
+                    best_ask = float(best_ask)
                 except (ValueError, TypeError):
-                    # Skip malformed price data, continue with other updates
-                    pass
-
+                    best_ask = None  # Malformed price data, leave ask unchanged
+        else:
+            for pc in pcs:
+                # Extract best bid if provided in this change
+                bid = pc.get("best_bid")
+                if bid is not None:
+                    try:
+                        best_bid = float(bid)
+                    except (ValueError, TypeError):
+                        # Skip malformed price data, continue with other updates
+                        pass
+
+                # Extract best ask if provided in this change
+                ask = pc.get("best_ask")
+                if ask is not None:
+                    try:
+                        best_ask = float(ask)
+                    except (ValueError, TypeError):
+                        # Skip malformed price data, continue with other updates
+                        pass
+
+        st = self.state
         # Apply validated updates to book state
         if best_bid is not None:
-            self.state.best_bid = best_bid
+            st.best_bid = best_bid
         if best_ask is not None:
-            self.state.best_ask = best_ask
+            st.best_ask = best_ask
 
         # Update metadata and derived calculations
-        self.state.last_book_ts_ms = int(msg.get("timestamp", now_ms()))
+        ts = msg.get("timestamp")
+        st.last_book_ts_ms = now_ms() if ts is None else int(ts)
+        if best_bid is None and best_ask is None:
+            return  # Nothing usable in this message: mid unchanged, nothing to log
         self._update_mid()
 
         # Log incremental price changes for market analysis
         self.logger.write("ws_price_change", {
-            "best_bid": self.state.best_bid,
-            "best_ask": self.state.best_ask,
-            "mid": self.state.mid,
+            "best_bid": st.best_bid,
+            "best_ask": st.best_ask,
+            "mid": st.mid,
             "n_changes": len(pcs)  # Track batch size for performance monitoring
         })
 
@@ -319,11 +381,13 @@ class MarketData:
             market activity levels and adjust trading aggressiveness accordingly.
         """
         p = float(msg["price"])
-        ts = int(msg.get("timestamp", now_ms()))
+        ts = msg.get("timestamp")
+        ts = now_ms() if ts is None else int(ts)
 
         # Update book state with latest execution
-        self.state.last_trade_price = p
-        self.state.last_trade_ts_ms = ts
+        st = self.state
+        st.last_trade_price = p
+        st.last_trade_ts_ms = ts
 
         # Maintain rolling trade history for rate calculations
         self.trade_ts.append(ts)
@@ -344,7 +408,7 @@ class MarketData:
         - Trading frequency (higher activity = more frequent quotes)
 
         Algorithm:
-        - Counts trades in the specified time window
+        - Counts trades in the specified time window (binary search)
         - Calculates rate as trades per second
         - Uses rolling buffer of recent trade timestamps
         - Handles edge cases (empty buffer, very short windows)
@@ -362,9 +426,8 @@ class MarketData:
             - 10.0+ = high activity (very liquid market)
 
         Performance:
-            - O(k) complexity where k is trades in window
-            - Typically fast due to limited buffer size (5000 trades)
-            - Optimized with early termination on timestamp sorting
+            - Binary search over the time-ordered buffer (about log2 n deque lookups)
+            - Independent of how many trades fall inside the window
 
         Note:
             Trade rate is a key input to volatility estimation and
@@ -377,13 +440,10 @@ class MarketData:
         # Convert window to milliseconds for timestamp comparison
         cutoff = t_now - int(window_s * 1000)
 
-        # Count trades within the analysis window
-        # Iterate backwards for efficiency (recent trades first)
-        n = 0
-        for ts in reversed(self.trade_ts):
-            if ts < cutoff:
-                break  # All remaining trades are older, exit early
-            n += 1
+        # Count trades within the analysis window. trade_ts is appended in
+        # arrival (time) order, so everything from the first ts >= cutoff on
+        # is inside the window.
+        n = len(self.trade_ts) - bisect_left(self.trade_ts, cutoff)
 
         # Calculate rate, avoid division by zero
         return n / max(window_s, 1e-9)
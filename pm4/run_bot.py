@@ -14,6 +14,12 @@ import os
 import signal
 import sys
 
+# Optional: uvloop's libuv event loop has lower per-callback overhead for the WS feed
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 from .adapters import PolymarketAdapter
 from .config import load_config
 from .trading import MarketMakerBot
@@ -98,13 +104,14 @@ async def main():
     # Initialize bot
     bot = MarketMakerBot(cfg, ex)
 
-    # Setup signal handlers for graceful shutdown
+    # Setup signal handlers for graceful shutdown. The callback just sets the
+    # shutdown event, so repeated signals do not spawn extra tasks.
     loop = asyncio.get_running_loop()
-    for sig in (signal.SIGINT, signal.SIGTERM):
-        try:
-            loop.add_signal_handler(sig, lambda: asyncio.create_task(bot.shutdown()))
-        except NotImplementedError:
-            pass
+    try:
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, bot.request_shutdown)
+    except NotImplementedError:
+        pass  # Event loop without signal support (e.g. Windows)
 
     # Run bot
     try:
@@ -119,5 +126,13 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    if uvloop is None:
+        asyncio.run(main())
+    elif sys.version_info >= (3, 11):
+        with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+            runner.run(main())
+    else:
+        # asyncio.Runner arrived in 3.11; older versions use the (now deprecated) policy API
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        asyncio.run(main())
 
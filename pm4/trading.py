@@ -3,10 +3,13 @@ Core trading logic for PM4 market maker.
 """
 import asyncio
 import datetime as dt
+import functools
 import json
 import math
+import operator
 import os
 import time
+from bisect import bisect_left
 from collections import deque
 from typing import Any, Deque, Dict, List, Optional, Set
 
@@ -16,6 +19,34 @@ from .market_data import MarketData
 from .types import BotConfig
 from .utils import clip, fmt, logit, now_ms, sigmoid
 
+# Optional: orjson parses WS frames several times faster than stdlib json
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+# Optional: NumPy selects the median/MAD in O(n) instead of sorting the returns
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+@functools.lru_cache(maxsize=64)
+def _ema_alpha(tau_s: float, dt_s: float) -> float:
+    """Smoothing factor α = 1 - exp(-dt/τ) for an EMA step (1.0 when τ <= 0).
+
+    Taus and the sample interval only change when meta-calibration adapts them,
+    so the exp is evaluated once per distinct (τ, dt) pair instead of per update.
+    """
+    if tau_s <= 0:
+        return 1.0
+    return 1.0 - math.exp(-dt_s / tau_s)
+
+
+# C-level sort key for ladder levels (avoids a Python lambda call per comparison)
+_price_key = operator.itemgetter("price")
+
 
 def build_v1_ladder(
     *,
@@ -118,15 +149,12 @@ def build_v1_ladder(
         """Remove duplicate prices, keeping the best level for each price."""
         seen = {}
         for l in levels:
-            px = l["price"]
-            if px not in seen:
-                seen[px] = l
-            else:
-                # Keep the level closest to reference price (smallest level number)
-                if l["level"] < seen[px]["level"]:
-                    seen[px] = l
+            # Keep the level closest to reference price (smallest level number)
+            kept = seen.setdefault(l["price"], l)
+            if l["level"] < kept["level"]:
+                seen[l["price"]] = l
         # Sort by price (descending for bids, ascending for asks)
-        return sorted(seen.values(), key=lambda x: x["price"], reverse=(side == "bid"))
+        return sorted(seen.values(), key=_price_key, reverse=(side == "bid"))
 
     return {
         "bids": dedupe(bids, "bid"),
@@ -198,10 +226,7 @@ class Indicators:
         """
         if tau_s <= 0:
             return x
-        # Calculate smoothing factor α = 1 - exp(-dt/τ)
-        # This ensures stability and proper time-based smoothing
-        a = 1.0 - math.exp(-dt_s / tau_s)
-        return prev + a * (x - prev)
+        return prev + _ema_alpha(tau_s, dt_s) * (x - prev)
 
     def time_factor(self, t_ms: int) -> float:
         """Calculate time-based risk adjustment factor.
@@ -237,10 +262,11 @@ class Indicators:
         Returns:
             One-sided bankroll allocation (half of total per market)
         """
+        risk = self.cfg.risk
         # Equal allocation across n_plays concurrent markets
-        w = 1.0 / max(self.cfg.risk.n_plays, 1)
+        w = 1.0 / max(risk.n_plays, 1)
         # Allocate half bankroll to each side (buy/sell)
-        return 0.5 * self.cfg.risk.bankroll_B * w
+        return 0.5 * risk.bankroll_B * w
 
     def q_max(self, p: float, q: float, t_ms: int) -> float:
         """Calculate maximum position size using Kelly criterion.
@@ -308,14 +334,15 @@ class Indicators:
             Formula: γ = 1 / (1 - |q̂|)^γₐ
             where γₐ controls the aggressiveness of spread scaling.
         """
+        risk = self.cfg.risk
         # Ensure |qhat| is in [0, 1) to avoid division by zero
         u = clip(abs(qhat), 0.0, 0.999999)
 
         # Power-law spread scaling: higher positions = wider spreads
-        g = 1.0 / ((1.0 - u) ** self.cfg.risk.gamma_a)
+        g = 1.0 / ((1.0 - u) ** risk.gamma_a)
 
         # Cap maximum spread scaling for stability
-        return clip(g, 1.0, self.cfg.risk.gamma_max)
+        return clip(g, 1.0, risk.gamma_max)
 
     def A_p(self, p: float) -> float:
         """Calculate probability weighting adjustment factor.
@@ -361,9 +388,10 @@ class Indicators:
             Formula: L(U) = (U_ref / (U + U_ref))^α_U
             α_U controls sensitivity to liquidity changes.
         """
-        Uref = max(self.cfg.risk.U_ref, 1e-9)
+        risk = self.cfg.risk
+        Uref = max(risk.U_ref, 1e-9)
         # Sigmoid-like response to liquidity changes
-        return (Uref / (U + Uref)) ** self.cfg.risk.alpha_U
+        return (Uref / (U + Uref)) ** risk.alpha_U
 
     def lambda_struct(self, p: float, U: float) -> float:
         """Calculate market regime adjustment factor.
@@ -386,18 +414,19 @@ class Indicators:
             Combines A(p) and L(U) with configurable weights w_A and w_L.
             Output is linearly scaled to stay within configured bounds.
         """
+        risk = self.cfg.risk
         # Calculate individual adjustment factors
         A = self.A_p(p)
         L = self.L_U(U)
 
         # Weighted combination of probability and liquidity factors
-        s = self.cfg.risk.w_A * (A - 1.0) + self.cfg.risk.w_L * (L - 1.0)
+        s = risk.w_A * (A - 1.0) + risk.w_L * (L - 1.0)
 
         # Normalize to [-1, 1] range for linear scaling
-        g = clip(s / max(self.cfg.risk.s_scale, 1e-9), -1.0, 1.0)
+        g = clip(s / max(risk.s_scale, 1e-9), -1.0, 1.0)
 
         # Linear interpolation between min and max bounds
-        lam_min, lam_max = self.cfg.risk.lambda_min, self.cfg.risk.lambda_max
+        lam_min, lam_max = risk.lambda_min, risk.lambda_max
         if g > 0:
             lam = 1.0 + (lam_max - 1.0) * g
         else:
@@ -445,55 +474,53 @@ class Indicators:
         h1_ms = int(self.get_markout_h1_s() * 1000)  # Short-term horizon
         h2_ms = int(self.get_markout_h2_s() * 1000)  # Long-term horizon
 
-        # Process pending fills that have reached analysis horizons
-        keep: Deque[Dict[str, Any]] = deque(maxlen=self._fills_pending.maxlen)
+        # Fills younger than both horizons need no work this sample
+        h_min_ms = min(h1_ms, h2_ms)
+        # Both toxicity EMAs share one smoothing factor
+        a_tox = _ema_alpha(self.get_tau_fast_s(), self.get_dt_sample_s())
+        write = self.logger.write
+        completed = False
 
-        for f in list(self._fills_pending):
-            tf = int(f["ts_ms"])
+        # Process pending fills that have reached analysis horizons
+        for f in self._fills_pending:
+            age_ms = t_ms - int(f["ts_ms"])
+            if age_ms < h_min_ms:
+                continue
 
             # Convert fill price to logit space on first analysis
-            if "x_fill" not in f:
-                f["x_fill"] = logit(float(f["price"]))
+            x_fill = f.get("x_fill")
+            if x_fill is None:
+                x_fill = f["x_fill"] = logit(float(f["price"]))
 
-            # Determine position direction (+1 for BUY, -1 for SELL)
-            s = 1.0 if f.get("side") == "BUY" else -1.0
-            x_fill = float(f["x_fill"])
+            # Markout: direction * (current_logit - fill_logit)
+            # Positive markout = profitable, negative = loss
+            mo = (x_now - x_fill) if f.get("side") == "BUY" else (x_fill - x_now)
+            # Only consider positive outcomes for toxicity measure
+            pos = mo if mo > 0.0 else 0.0
 
             # Short-term markout analysis (h1 horizon)
-            if (t_ms - tf) >= h1_ms and not f.get("h1_done"):
-                # Calculate markout: direction * (current_logit - fill_logit)
-                # Positive markout = profitable, negative = loss
-                mo = s * (x_now - x_fill)
-                # Only consider positive outcomes for toxicity measure
-                pos = max(0.0, mo)
-
-                # Update exponential moving average of positive markouts
-                self._tox_ema_pos_h1 = self._ema(
-                    self._tox_ema_pos_h1, pos,
-                    self.get_tau_fast_s(),
-                    self.get_dt_sample_s()
-                )
-                f["h1_done"] = True
-                self.logger.write("markout_h1", {"mo": mo, "pos": pos})
+            h1_done = f.get("h1_done")
+            if not h1_done and age_ms >= h1_ms:
+                self._tox_ema_pos_h1 += a_tox * (pos - self._tox_ema_pos_h1)
+                f["h1_done"] = h1_done = True
+                write("markout_h1", {"mo": mo, "pos": pos})
 
             # Long-term markout analysis (h2 horizon)
-            if (t_ms - tf) >= h2_ms and not f.get("h2_done"):
-                mo = s * (x_now - x_fill)
-                pos = max(0.0, mo)
-
-                self._tox_ema_pos_h2 = self._ema(
-                    self._tox_ema_pos_h2, pos,
-                    self.get_tau_fast_s(),
-                    self.get_dt_sample_s()
-                )
-                f["h2_done"] = True
-                self.logger.write("markout_h2", {"mo": mo, "pos": pos})
-
-            # Keep fills that haven't completed both analyses
-            if not (f.get("h1_done") and f.get("h2_done")):
-                keep.append(f)
-
-        self._fills_pending = keep
+            h2_done = f.get("h2_done")
+            if not h2_done and age_ms >= h2_ms:
+                self._tox_ema_pos_h2 += a_tox * (pos - self._tox_ema_pos_h2)
+                f["h2_done"] = h2_done = True
+                write("markout_h2", {"mo": mo, "pos": pos})
+
+            if h1_done and h2_done:
+                completed = True
+
+        # Drop fills that have completed both analyses (rebuild only when needed)
+        if completed:
+            self._fills_pending = deque(
+                (f for f in self._fills_pending if not (f.get("h1_done") and f.get("h2_done"))),
+                maxlen=self._fills_pending.maxlen,
+            )
 
     def on_time_sample(self, t_ms: int, p_mid: float, trade_rate_per_s: float) -> None:
         """Update volatility estimates and market condition indicators.
@@ -548,16 +575,22 @@ class Indicators:
 
         # Multi-timeframe volatility estimation using EMAs
         # Fast EMAs capture short-term dynamics, slow EMAs provide baseline
-        self._ema_fast_abs = self._ema(self._ema_fast_abs, abs_r, self.get_tau_fast_s(), dt_s)
-        self._ema_slow_abs = self._ema(self._ema_slow_abs, abs_r, self.get_tau_slow_s(), dt_s)
+        # Smoothing factors are shared by every EMA on the same timescale
+        a_fast = _ema_alpha(self.get_tau_fast_s(), dt_s)
+        a_slow = _ema_alpha(self.get_tau_slow_s(), dt_s)
+        self._ema_fast_abs += a_fast * (abs_r - self._ema_fast_abs)
+        self._ema_slow_abs += a_slow * (abs_r - self._ema_slow_abs)
 
         # Directional momentum indicators
-        self._ema_fast_r = self._ema(self._ema_fast_r, r, self.get_tau_fast_s(), dt_s)
-        self._ema_fast_abs_r = self._ema(self._ema_fast_abs_r, abs_r, self.get_tau_fast_s(), dt_s)
-        self._ema_slow_abs_r = self._ema(self._ema_slow_abs_r, abs_r, self.get_tau_slow_s(), dt_s)
+        self._ema_fast_r += a_fast * (r - self._ema_fast_r)
+        self._ema_fast_abs_r += a_fast * (abs_r - self._ema_fast_abs_r)
+        self._ema_slow_abs_r += a_slow * (abs_r - self._ema_slow_abs_r)
+
+        risk = self.cfg.risk
+        warmup = self.cfg.warmup
 
         # Trading intensity factor (normalized trading activity)
-        I = clip(trade_rate_per_s / max(self.cfg.quote.rate_ref_per_s, 1e-9), 1.0, self.cfg.risk.I_max)
+        I = clip(trade_rate_per_s / max(self.cfg.quote.rate_ref_per_s, 1e-9), 1.0, risk.I_max)
 
         # Volatility ratio: fast/slow EMA of absolute returns
         # J > 1 indicates increasing volatility, J < 1 indicates decreasing
@@ -567,27 +600,31 @@ class Indicators:
         # D close to 1 indicates strong directional movement
         D = abs(self._ema_fast_r) / max(self._ema_fast_abs_r, 1e-9)
 
-        # Combined volatility-stress indicator
-        S_sigma = max(math.log(max(J, 1.0)), 0.0) * clip(D, 0.0, 1.0) * I
+        # Combined volatility-stress indicator (zero unless volatility is rising;
+        # D is non-negative, so clipping it to [0, 1] is just a cap at 1)
+        if J <= 1.0:
+            S_sigma = 0.0
+        else:
+            S_sigma = math.log(J) * (D if D < 1.0 else 1.0) * I
 
         # Toxicity measure: weighted combination of markout horizons
         # Measures adverse selection costs from trade execution
-        T = (self.cfg.warmup.markout_w1 * self._tox_ema_pos_h1 +
-             self.cfg.warmup.markout_w2 * self._tox_ema_pos_h2)
+        T = (warmup.markout_w1 * self._tox_ema_pos_h1 +
+             warmup.markout_w2 * self._tox_ema_pos_h2)
 
         # Normalized toxicity relative to baseline volatility
         Z_tox = T / max(self._ema_slow_abs_r, 1e-9)
 
         # Total stress indicator combining volatility and toxicity
-        S = S_sigma + self.cfg.risk.c_tox * Z_tox
+        S = S_sigma + risk.c_tox * Z_tox
 
         # Final volatility estimate with configurable scaling
-        sigma_raw = 1.0 + self.cfg.risk.c_sigma * (S ** self.cfg.risk.nu_sigma)
-        sigma_raw = clip(sigma_raw, 1.0, self.cfg.risk.sigma_max)
+        sigma_raw = 1.0 + risk.c_sigma * (S ** risk.nu_sigma)
+        sigma_raw = clip(sigma_raw, 1.0, risk.sigma_max)
 
         # Adaptive smoothing: faster response to volatility increases
-        tau = (self.cfg.risk.sigma_tau_up_s if sigma_raw > self._sigma_smoothed
-               else self.cfg.risk.sigma_tau_down_s)
+        tau = (risk.sigma_tau_up_s if sigma_raw > self._sigma_smoothed
+               else risk.sigma_tau_down_s)
 
         self._sigma_smoothed = self._ema(self._sigma_smoothed, sigma_raw, tau, dt_s)
 
@@ -638,21 +675,31 @@ class Indicators:
             - sigma_base_logit_per_dt: Baseline volatility estimate
             - ema_fast_abs, ema_slow_abs: Volatility EMA values
         """
-        rs = list(self._returns)
-        if not rs:
+        n = len(self._returns)
+        if not n:
             return {"n_returns": 0}
 
         # Use median and MAD (Median Absolute Deviation) for robust statistics
         # More resistant to outliers than mean/std approaches
-        med = sorted(rs)[len(rs) // 2]  # Median return
-        abs_dev = [abs(x - med) for x in rs]
-        mad = sorted(abs_dev)[len(abs_dev) // 2]  # MAD
+        k = n // 2
+        if np is not None:
+            # Quickselect (np.partition) picks the same order statistics as a sort
+            arr = np.fromiter(self._returns, dtype=np.float64, count=n)
+            med = float(np.partition(arr, k)[k])  # Median return
+            np.abs(np.subtract(arr, med, out=arr), out=arr)
+            mad = float(np.partition(arr, k)[k])  # MAD
+        else:
+            rs = sorted(self._returns)
+            med = rs[k]  # Median return
+            abs_dev = [abs(x - med) for x in rs]
+            abs_dev.sort()
+            mad = abs_dev[k]  # MAD
 
         # Convert MAD to standard deviation estimate (robust scale factor)
         sigma_base = 1.4826 * mad
 
         return {
-            "n_returns": len(rs),
+            "n_returns": n,
             "dt_sample_s": self.cfg.warmup.dt_sample_s,
             "sigma_base_logit_per_dt": sigma_base,
             "ema_fast_abs": self._ema_fast_abs,
@@ -1109,12 +1156,10 @@ class Quoter:
         t_now = now_ms()
         cutoff = t_now - int(self.U_proxy_window_s * 1000)
 
-        # Count trades within the analysis window
-        n = 0
-        for ts in reversed(self.md.trade_ts):
-            if ts < cutoff:
-                break
-            n += 1
+        # Count trades within the analysis window (trade_ts is time-ordered,
+        # so a binary search finds the window start, as in trade_rate_per_s)
+        trade_ts = self.md.trade_ts
+        n = len(trade_ts) - bisect_left(trade_ts, cutoff)
 
         # Square root provides smoother scaling and prevents extreme values
         return math.sqrt(n)
@@ -1181,19 +1226,21 @@ class Quoter:
 
         # === SPREAD CALCULATION ===
 
+        qc = self.cfg.quote
+
         # Risk-based spread component (accounts for position and volatility)
-        Delta_risk = self.cfg.quote.c_risk * gamma * lam * sigma
+        Delta_risk = qc.c_risk * gamma * lam * sigma
 
         # Liquidity-based spread component (market impact consideration)
         rate = self.md.trade_rate_per_s(window_s=60.0)
-        kappa_scale = 1.0 + (rate / max(self.cfg.quote.rate_ref_per_s, 1e-9))
-        kappa = self.cfg.quote.kappa0 * kappa_scale
+        kappa_scale = 1.0 + (rate / max(qc.rate_ref_per_s, 1e-9))
+        kappa = qc.kappa0 * kappa_scale
 
         # Liquidity-adjusted spread using market impact model
         Delta_liq = (1.0 / gamma) * math.log(1.0 + gamma / max(kappa, 1e-9))
 
         # Total half-spread in logit space
-        base_half_spread = clip(Delta_risk + Delta_liq, 0.0, self.cfg.quote.max_half_spread_logit)
+        base_half_spread = clip(Delta_risk + Delta_liq, 0.0, qc.max_half_spread_logit)
 
         # === ORDER LADDER CONSTRUCTION ===
 
@@ -1207,10 +1254,10 @@ class Quoter:
             half_a=base_half_spread,
             tick=s.tick_size,
             B_side=B_side,
-            decay=self.cfg.quote.ladder_decay,
-            step_mult=self.cfg.quote.ladder_step_mult,
-            min_step_logit=self.cfg.quote.ladder_min_step_logit,
-            max_levels=self.cfg.quote.ladder_max_levels
+            decay=qc.ladder_decay,
+            step_mult=qc.ladder_step_mult,
+            min_step_logit=qc.ladder_min_step_logit,
+            max_levels=qc.ladder_max_levels
         )
 
         # === ORDER SIZE MANAGEMENT ===
@@ -1224,7 +1271,7 @@ class Quoter:
 
             for o in raw_orders:
                 # Ensure minimum order size
-                sz = max(self.cfg.quote.min_order_size, o["size"])
+                sz = max(qc.min_order_size, o["size"])
                 px = o["price"]
 
                 # Calculate notional impact (risk exposure)
@@ -1232,7 +1279,7 @@ class Quoter:
                 notional_impact = px * sz if side == "BUY" else (1.0 - px) * sz
 
                 # Enforce per-side notional limits
-                if total_notional + notional_impact > self.cfg.quote.max_order_notional_side:
+                if total_notional + notional_impact > qc.max_order_notional_side:
                     break
 
                 total_notional += notional_impact
@@ -1283,9 +1330,12 @@ class MarketMakerBot:
 
         # Conditionally create enhanced logger based on configuration
         if cfg.logging.level != "INFO" or cfg.logging.enable_performance:
-            self.logger = DebugLogger(cfg.log_path, level=cfg.logging.level)
+            self.logger = DebugLogger(
+                cfg.log_path, level=cfg.logging.level, batch_size=cfg.logging.batch_size
+            )
         else:
-            self.logger = JsonlLogger(cfg.log_path)  # Backward compatibility
+            # Backward compatibility
+            self.logger = JsonlLogger(cfg.log_path, batch_size=cfg.logging.batch_size)
 
         self.md = MarketData(self.logger)
         self.ind = Indicators(cfg, self.logger)
@@ -1293,9 +1343,13 @@ class MarketMakerBot:
         self._shutdown = asyncio.Event()
         self._last_fills_poll_ms = now_ms() - 60_000
 
-    async def shutdown(self):
+    def request_shutdown(self) -> None:
+        """Ask all bot loops to stop (idempotent; safe as a signal callback)."""
         self._shutdown.set()
 
+    async def shutdown(self):
+        self.request_shutdown()
+
     async def _ws_loop(self):
         import websockets
         mc = self.cfg.market
@@ -1305,20 +1359,12 @@ class MarketMakerBot:
             self.logger.write("ws_subscribe", {"payload": sub})
             async for raw in ws:
                 try:
-                    msg = json.loads(raw)
+                    msg = _json_loads(raw)
                 except Exception:
                     self.logger.write("ws_parse_error", {"raw": raw[:2000]})
                     continue
                 et = msg.get("event_type") or msg.get("type")
-                if et == "book":
-                    self.md.on_book(msg)
-                elif et == "price_change":
-                    self.md.on_price_change(msg)
-                elif et == "tick_size_change":
-                    self.md.on_tick_size_change(msg)
-                elif et == "last_trade_price":
-                    self.md.on_last_trade_price(msg)
-                else:
+                if not self.md.handle(et, msg):
                     self.logger.write("ws_unknown", {"msg": msg})
                 if self._shutdown.is_set():
                     break
@@ -1440,6 +1486,13 @@ class MarketMakerBot:
                 self.logger.write("fills_poll_error", {"err": str(e)})  # Keep for backward compatibility
             await asyncio.sleep(2.0)
 
+    async def _flush_log_loop(self):
+        """Write out batched log lines that would otherwise wait for the next event."""
+        interval_s = max(self.logger.max_batch_delay_ms, 1) / 1000.0
+        while not self._shutdown.is_set():
+            await asyncio.sleep(interval_s)
+            self.logger.flush_if_due()
+
     async def _reconcile(self, desired: Dict[str, Any]):
         """Reconcile desired orders with current order book state.
 
@@ -1583,12 +1636,15 @@ class MarketMakerBot:
             await asyncio.sleep(self.cfg.quote.refresh_s)
 
     async def run(self):
-        ws_task = asyncio.create_task(self._ws_loop())
+        tasks = [asyncio.create_task(self._ws_loop())]
+        if self.logger.batch_size > 1:
+            # Enforce max_batch_delay_ms even when no new events arrive
+            tasks.append(asyncio.create_task(self._flush_log_loop()))
         await self._warmup()
-        fills_task = asyncio.create_task(self._poll_fills())
-        quote_task = asyncio.create_task(self._quote_loop())
+        tasks.append(asyncio.create_task(self._poll_fills()))
+        tasks.append(asyncio.create_task(self._quote_loop()))
         await self._shutdown.wait()
-        for t in (quote_task, fills_task, ws_task):
+        for t in reversed(tasks):
             t.cancel()
         self.logger.write("shutdown", {})
         self.logger.close()
@@ -80,6 +80,7 @@ class LoggingConfig:
     level: str = "INFO"  # DEBUG, INFO, WARNING, ERROR, CRITICAL
     enable_performance: bool = False
     enable_context_tracking: bool = False
+    batch_size: int = 1  # Events per log write; >1 batches for high message rates
 
 
 @dataclass
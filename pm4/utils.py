@@ -2,14 +2,34 @@
 Utility functions for PM4 market maker.
 """
 import math
+import sys
 import time
 from datetime import datetime
 from typing import Union
 
+# Optional: ciso8601 parses ISO-8601 in C (Z suffix included); otherwise use
+# fromisoformat(), which understands a trailing 'Z' natively from Python 3.11
+try:
+    from ciso8601 import parse_datetime as _fromisoformat
+except ImportError:
+    if sys.version_info >= (3, 11):
+        _fromisoformat = datetime.fromisoformat
+    else:
+        def _fromisoformat(value: str) -> datetime:
+            if value.endswith('Z'):
+                value = value[:-1] + '+00:00'
+            return datetime.fromisoformat(value)
+
+
+# slots=True needs Python 3.10+; older interpreters get a plain dataclass.
+# Usage: @dataclass(**DATACLASS_SLOTS)
+DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
 
 def now_ms() -> int:
     """Get current timestamp in milliseconds."""
-    return int(time.time() * 1000)
+    # Integer nanoseconds: no float multiply/round-trip on this hot path
+    return time.time_ns() // 1_000_000
 
 
 def clip(x: float, lo: float, hi: float) -> float:
@@ -82,6 +102,22 @@ def date_to_timestamp(date_str: str) -> int:
     raise ValueError(f"Could not parse date: {date_str}. Supported formats: {formats}")
 
 
+def parse_iso8601(value: str) -> datetime:
+    """Parse an ISO-8601 timestamp such as the Gamma API's "2025-01-01T12:00:00Z".
+
+    Args:
+        value: ISO-8601 date or datetime string (a trailing 'Z' means UTC)
+
+    Returns:
+        Parsed datetime (timezone-aware when the string carries an offset)
+
+    Raises:
+        ValueError: If the string is not a valid ISO-8601 timestamp
+        TypeError: If value is not a string
+    """
+    return _fromisoformat(value)
+
+
 def timestamp_to_date(ts_ms: int) -> str:
     """Convert Unix timestamp in milliseconds to readable date string.
 
@@ -365,6 +365,68 @@ class TestLoggerFileOperations:
         assert nested_path.exists()
         assert nested_path.parent.exists()
 
+    @pytest.mark.unit
+    def test_logger_directory_creation_cached(self, temp_dir):
+        """Test that a shared log directory is only created once per process."""
+        log_dir = temp_dir / "shared"
+        JsonlLogger(str(log_dir / "bot.jsonl"))
+
+        with patch("pm4.logging.os.makedirs") as mock_makedirs:
+            logger = JsonlLogger(str(log_dir / "debug.jsonl"))
+
+        mock_makedirs.assert_not_called()
+        assert (log_dir / "debug.jsonl").exists()
+        logger.close()
+
+    @pytest.mark.unit
+    def test_logger_batched_writes(self, temp_dir):
+        """Test that batched events reach the file per batch and on close."""
+        log_path = temp_dir / "batched.jsonl"
+        logger = JsonlLogger(str(log_path), batch_size=3)
+
+        with patch("pm4.logging.now_ms", return_value=1_000):
+            for i in range(4):
+                logger.write("event", {"index": i})
+            # First batch of 3 written, 4th still pending
+            assert len(log_path.read_text().splitlines()) == 3
+
+            logger.close()
+
+        lines = log_path.read_text().splitlines()
+        assert [json.loads(line)["index"] for line in lines] == [0, 1, 2, 3]
+
+    @pytest.mark.unit
+    def test_logger_batch_max_delay(self, temp_dir):
+        """Test that a pending batch is written once it gets too old."""
+        log_path = temp_dir / "batched.jsonl"
+        logger = JsonlLogger(str(log_path), batch_size=100, max_batch_delay_ms=50)
+
+        with patch("pm4.logging.now_ms", return_value=1_000):
+            logger.write("event", {"index": 0})
+        assert log_path.read_text() == ""
+
+        with patch("pm4.logging.now_ms", return_value=1_050):
+            logger.write("event", {"index": 1})
+        assert len(log_path.read_text().splitlines()) == 2
+        logger.close()
+
+    @pytest.mark.unit
+    def test_logger_flush_if_due(self, temp_dir):
+        """Test that an old pending batch is written without a new event."""
+        log_path = temp_dir / "batched.jsonl"
+        logger = JsonlLogger(str(log_path), batch_size=100, max_batch_delay_ms=50)
+
+        with patch("pm4.logging.now_ms", return_value=1_000):
+            logger.write("event", {"index": 0})
+        with patch("pm4.logging.now_ms", return_value=1_049):
+            logger.flush_if_due()
+        assert log_path.read_text() == ""
+
+        with patch("pm4.logging.now_ms", return_value=1_050):
+            logger.flush_if_due()
+        assert len(log_path.read_text().splitlines()) == 1
+        logger.close()
+
     @pytest.mark.unit
     def test_logger_buffering(self, temp_dir):
         """Test that logger properly buffers writes."""
@@ -0,0 +1,286 @@
+"""
+Tests for Gamma API fetching in pm4/market_analyzer.py.
+
+Tests cover:
+- Bulk list-endpoint fetching and per-slug fallback
+- Response cache contents after batch analysis
+- Endpoint hints (sync and async lookups)
+- Negative caching of slugs unknown to both endpoints
+"""
+import asyncio
+import io
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from pm4.market_analyzer import NEGATIVE_CACHE_TTL_S, MarketAnalyzer, aiohttp
+from pm4.market_cache import FileCache
+
+
+class _FakeResponse:
+    """Minimal requests.Response stand-in (context manager, content and raw stream)."""
+
+    def __init__(self, status=200, payload=None, content_type="application/json"):
+        self.status_code = status
+        self.headers = {"Content-Type": content_type}
+        self.content = b"" if payload is None else json.dumps(payload).encode("utf-8")
+        self.raw = io.BytesIO(self.content)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class _FakeAioResponse:
+    """Minimal aiohttp response stand-in (async context manager)."""
+
+    def __init__(self, status=200, payload=None, content_type="application/json"):
+        self.status = status
+        self.headers = {"Content-Type": content_type}
+        self._body = b"" if payload is None else json.dumps(payload).encode("utf-8")
+
+    async def read(self):
+        return self._body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class _FakeAioSession:
+    """Records requested URLs and answers each with route(url) -> _FakeAioResponse."""
+
+    def __init__(self, route):
+        self.route = route
+        self.urls = []
+
+    def get(self, url, timeout=None):
+        self.urls.append(url)
+        return self.route(url)
+
+
+requires_aiohttp = pytest.mark.skipif(aiohttp is None, reason="aiohttp not installed")
+
+
+def _market(slug, **extra):
+    """Gamma market payload with the fields the analysis reads."""
+    data = {"slug": slug, "conditionId": f"0x{slug}", "bestBid": 0.45, "bestAsk": 0.47}
+    data.update(extra)
+    return data
+
+
+@pytest.fixture
+def analyzer():
+    """MarketAnalyzer with caching off and a mocked HTTP session."""
+    a = MarketAnalyzer(use_cache=False)
+    a.session = MagicMock()
+    return a
+
+
+class TestGetMarketsBulk:
+    """Test the list-endpoint bulk fetch."""
+
+    @pytest.mark.unit
+    def test_requests_are_batched_by_batch_size(self, analyzer):
+        """Test that N slugs cost ceil(N / batch_size) list requests."""
+        def fake_get(url, params=None, **kwargs):
+            slugs = [value for key, value in params if key == "slug"]
+            return _FakeResponse(payload=[_market(slug) for slug in slugs])
+
+        analyzer.session.get.side_effect = fake_get
+
+        found = analyzer.get_markets_bulk(["a", "b", "c", "a"], batch_size=2)
+
+        assert analyzer.session.get.call_count == 2
+        batches = [
+            [value for key, value in call.kwargs["params"] if key == "slug"]
+            for call in analyzer.session.get.call_args_list
+        ]
+        assert batches == [["a", "b"], ["c"]]
+        assert sorted(found) == ["a", "b", "c"]
+        assert found["c"]["conditionId"] == "0xc"
+
+    @pytest.mark.unit
+    def test_unrequested_markets_are_ignored(self, analyzer):
+        """Test that list results outside the requested batch are dropped."""
+        analyzer.session.get.return_value = _FakeResponse(payload=[_market("a"), _market("zzz")])
+
+        assert list(analyzer.get_markets_bulk(["a"])) == ["a"]
+
+    @pytest.mark.unit
+    def test_event_slugs_fall_back_to_per_slug_fetch(self, analyzer):
+        """Test that slugs missing from the list response are fetched individually."""
+        analyzer.session.get.return_value = _FakeResponse(payload=[_market("plain-market")])
+
+        with patch("pm4.market_analyzer.aiohttp", None), \
+                patch.object(analyzer, "_fetch_market_data", return_value=_market("some-event")) as fetch:
+            analyses = analyzer.analyze_many(["plain-market", "some-event"])
+
+        fetch.assert_called_once_with("some-event")
+        assert [a.condition_id for a in analyses] == ["0xplain-market", "0xsome-event"]
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("failure", [
+        _FakeResponse(status=500),
+        _FakeResponse(payload={"error": "busy"}, content_type="text/html"),
+        requests.ConnectionError("connection reset"),
+    ])
+    def test_failed_bulk_request_falls_back_to_per_slug_fetch(self, analyzer, failure):
+        """Test that a failed list request leaves every slug to the per-slug fetch."""
+        if isinstance(failure, Exception):
+            analyzer.session.get.side_effect = failure
+        else:
+            analyzer.session.get.return_value = failure
+
+        with patch("pm4.market_analyzer.aiohttp", None), \
+                patch.object(analyzer, "_fetch_market_data", side_effect=_market) as fetch:
+            analyses = analyzer.analyze_many(["a", "b"])
+
+        assert sorted(call.args[0] for call in fetch.call_args_list) == ["a", "b"]
+        assert [a.condition_id for a in analyses] == ["0xa", "0xb"]
+
+
+class TestBulkCaching:
+    """Test what batch analysis leaves in the response cache."""
+
+    @pytest.mark.unit
+    def test_bulk_items_do_not_replace_full_payloads(self, analyzer, temp_dir):
+        """Test that get_market_data after analyze_many returns the full payload."""
+        analyzer.cache = FileCache(str(temp_dir))
+        full = {slug: _market(slug, extra={"rewards": [1, 2]}) for slug in ("a", "b")}
+
+        def fake_get(url, params=None, **kwargs):
+            if url.endswith("/markets"):
+                return _FakeResponse(payload=list(full.values()))
+            if "/markets/slug/" in url:
+                return _FakeResponse(payload=full[url.rsplit("/", 1)[1]])
+            return _FakeResponse(status=404)
+
+        analyzer.session.get.side_effect = fake_get
+
+        analyses = analyzer.analyze_many(["a", "b"])
+        assert [a.condition_id for a in analyses] == ["0xa", "0xb"]
+
+        assert analyzer.get_market_data("a") == full["a"]
+        assert analyzer.get_market_data("a", force_refresh=True) == full["a"]
+
+
+class TestEndpointHints:
+    """Test that the endpoint which served a slug is asked first next time."""
+
+    @pytest.mark.unit
+    def test_sync_lookup_uses_market_hint(self, analyzer):
+        """Test that a markets-endpoint slug skips the events request on repeat."""
+        def fake_get(url, **kwargs):
+            if "/markets/slug/" in url:
+                return _FakeResponse(payload=_market("plain"))
+            return _FakeResponse(status=404)
+
+        analyzer.session.get.side_effect = fake_get
+
+        assert analyzer._fetch_market_data("plain")["slug"] == "plain"
+        assert analyzer.session.get.call_count == 2
+        assert analyzer._get_endpoint_hint("plain") == "market"
+
+        analyzer.session.get.reset_mock()
+        assert analyzer._fetch_market_data("plain")["slug"] == "plain"
+        assert [c.args[0] for c in analyzer.session.get.call_args_list] == [
+            f"{analyzer.base_url}/markets/slug/plain"
+        ]
+
+    @pytest.mark.unit
+    @requires_aiohttp
+    def test_async_lookup_records_and_uses_market_hint(self, analyzer):
+        """Test that the second async lookup goes straight to the hinted endpoint."""
+        def route(url):
+            if "/markets/slug/" in url:
+                return _FakeAioResponse(payload=_market("plain"))
+            return _FakeAioResponse(status=404)
+
+        first = _FakeAioSession(route)
+        assert asyncio.run(analyzer._get_market_data_async(first, "plain"))["slug"] == "plain"
+        assert analyzer._get_endpoint_hint("plain") == "market"
+
+        second = _FakeAioSession(route)
+        assert asyncio.run(analyzer._get_market_data_async(second, "plain"))["slug"] == "plain"
+        assert second.urls == [f"{analyzer.base_url}/markets/slug/plain"]
+
+    @pytest.mark.unit
+    @requires_aiohttp
+    def test_async_stale_hint_falls_back_to_both_endpoints(self, analyzer):
+        """Test that a hinted endpoint with nothing usable falls back to the race."""
+        analyzer._endpoint_hints["moved"] = "market"
+
+        def route(url):
+            if "/events/slug/" in url:
+                return _FakeAioResponse(payload={"id": "e1", "slug": "moved", "markets": [_market("moved")]})
+            return _FakeAioResponse(status=404)
+
+        session = _FakeAioSession(route)
+        data = asyncio.run(analyzer._get_market_data_async(session, "moved"))
+
+        assert data["event_id"] == "e1"
+        assert session.urls[0] == f"{analyzer.base_url}/markets/slug/moved"
+        assert f"{analyzer.base_url}/events/slug/moved" in session.urls
+        assert analyzer._get_endpoint_hint("moved") == "event"
+
+
+class TestNegativeCache:
+    """Test that slugs both endpoints 404 on are not re-queried for a while."""
+
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        """Controllable time.monotonic() for negative-cache expiry."""
+        now = [1000.0]
+        monkeypatch.setattr("pm4.market_analyzer.time.monotonic", lambda: now[0])
+        return now
+
+    @pytest.mark.unit
+    def test_not_found_is_recorded_and_skipped(self, analyzer, clock):
+        """Test that a double 404 is remembered and the repeat lookup stays local."""
+        analyzer.session.get.return_value = _FakeResponse(status=404)
+
+        assert analyzer.get_market_data("gone") is None
+        assert analyzer.session.get.call_count == 2
+        assert analyzer._negative_cache["gone"] == 1000.0 + NEGATIVE_CACHE_TTL_S
+
+        clock[0] += NEGATIVE_CACHE_TTL_S - 1
+        assert analyzer.get_market_data("gone") is None
+        assert analyzer.session.get.call_count == 2
+
+    @pytest.mark.unit
+    def test_entry_expires_after_ttl(self, analyzer, clock):
+        """Test that the slug is queried again once the negative entry expires."""
+        analyzer.session.get.return_value = _FakeResponse(status=404)
+        analyzer.get_market_data("gone")
+
+        clock[0] += NEGATIVE_CACHE_TTL_S + 1
+        analyzer.session.get.return_value = _FakeResponse(payload=_market("gone"))
+
+        assert analyzer.get_market_data("gone")["slug"] == "gone"
+        assert "gone" not in analyzer._negative_cache
+
+    @pytest.mark.unit
+    def test_force_refresh_bypasses_negative_cache(self, analyzer, clock):
+        """Test that force_refresh queries the API despite a negative entry."""
+        analyzer.session.get.return_value = _FakeResponse(status=404)
+        analyzer.get_market_data("gone")
+
+        analyzer.session.get.return_value = _FakeResponse(payload=_market("gone"))
+
+        assert analyzer.get_market_data("gone", force_refresh=True)["slug"] == "gone"
+        assert analyzer.session.get.call_count == 3
+
+    @pytest.mark.unit
+    def test_other_failures_are_not_recorded(self, analyzer, clock):
+        """Test that server errors are not mistaken for an unknown slug."""
+        analyzer.session.get.return_value = _FakeResponse(status=503)
+
+        assert analyzer.get_market_data("flaky") is None
+        assert "flaky" not in analyzer._negative_cache
@@ -0,0 +1,96 @@
+"""
+Tests for the on-disk response cache in pm4/market_cache.py.
+
+Tests cover:
+- Round-trip storage and retrieval
+- TTL expiry (stored and caller-supplied)
+- Corrupt and unwritable cache handling
+- Concurrent writers of the same key
+"""
+import json
+import os
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from pm4.market_cache import FileCache
+
+
+class TestFileCache:
+    """Test FileCache storage and expiry."""
+
+    @pytest.mark.unit
+    def test_set_then_get_round_trip(self, temp_dir):
+        """Test that stored data is returned within the TTL."""
+        cache = FileCache(str(temp_dir), ttl_ms=60_000)
+        cache.set("some-market", {"conditionId": "0xabc", "volume24hr": 1.5})
+
+        assert cache.get("some-market") == {"conditionId": "0xabc", "volume24hr": 1.5}
+        assert cache.get("other-market") is None
+
+    @pytest.mark.unit
+    def test_entry_expires_after_ttl(self, temp_dir):
+        """Test that entries older than their TTL are treated as misses."""
+        cache = FileCache(str(temp_dir), ttl_ms=1_000)
+        with patch("pm4.market_cache.now_ms", return_value=1_000_000):
+            cache.set("some-market", {"id": 1})
+        with patch("pm4.market_cache.now_ms", return_value=1_000_500):
+            assert cache.get("some-market") == {"id": 1}
+            # Caller-supplied TTL overrides the stored one
+            assert cache.get("some-market", ttl_ms=100) is None
+        with patch("pm4.market_cache.now_ms", return_value=1_002_000):
+            assert cache.get("some-market") is None
+
+    @pytest.mark.unit
+    def test_corrupt_entry_is_a_miss(self, temp_dir):
+        """Test that an unreadable cache file does not raise."""
+        cache = FileCache(str(temp_dir))
+        cache.set("some-market", {"id": 1})
+        with open(cache._path("some-market"), "w") as fp:
+            fp.write("{not json")
+
+        assert cache.get("some-market") is None
+
+    @pytest.mark.unit
+    def test_unwritable_cache_dir_is_ignored(self, temp_dir):
+        """Test that write failures never propagate to the caller."""
+        blocker = temp_dir / "blocker"
+        blocker.write_text("")
+        cache = FileCache(str(blocker / "markets"))
+
+        cache.set("some-market", {"id": 1})
+
+        assert cache.get("some-market") is None
+
+    @pytest.mark.unit
+    def test_entry_format(self, temp_dir):
+        """Test the on-disk entry layout."""
+        cache = FileCache(str(temp_dir), ttl_ms=5_000)
+        cache.set("some-market", [1, 2, 3])
+
+        files = os.listdir(temp_dir)
+        assert len(files) == 1
+        with open(temp_dir / files[0]) as fp:
+            entry = json.load(fp)
+        assert entry["ttl_ms"] == 5_000
+        assert entry["data"] == [1, 2, 3]
+        assert isinstance(entry["fetched_ms"], int)
+
+    @pytest.mark.unit
+    def test_concurrent_writers_same_key(self, temp_dir):
+        """Test that threads storing one key leave a single valid entry and no temp files."""
+        cache = FileCache(str(temp_dir))
+
+        def writer(n):
+            for i in range(50):
+                cache.set("some-market", {"writer": n, "i": i})
+
+        threads = [threading.Thread(target=writer, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert os.listdir(temp_dir) == [os.path.basename(cache._path("some-market"))]
+        assert cache.get("some-market")["i"] == 49
@@ -0,0 +1,92 @@
+"""
+Tests for market configuration helpers in pm4/market_config_helper.py.
+
+Tests cover:
+- Slug extraction (kept consistent with the market analyzer)
+- In-process analysis cache (hit, miss, expiry, failed analyses)
+"""
+from dataclasses import replace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from pm4 import market_analyzer
+from pm4.market_analyzer import _EMPTY_ANALYSIS
+from pm4.market_config_helper import (
+    ANALYSIS_CACHE_TTL_MS,
+    _cached_analyze,
+    clear_analysis_cache,
+    extract_market_slug,
+)
+
+
+class TestExtractMarketSlug:
+    """Test URL-to-slug extraction."""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("url", [
+        "https://polymarket.com/market/will-eth-reach-10k",
+        "https://polymarket.com/event/crypto-prices/will-eth-reach-10k?tid=1",
+        "https://polymarket.com/event/will-eth-reach-10k#comments",
+        "https://gamma.polymarket.com/market/will-eth-reach-10k",
+        "will-eth-reach-10k",
+    ])
+    def test_matches_market_analyzer(self, url):
+        """Test that both tools parse the same URL to the same slug."""
+        assert extract_market_slug(url) == "will-eth-reach-10k"
+        assert extract_market_slug(url) == market_analyzer.extract_market_slug(url)
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("url", ["", "https://example.com/nothing-here"])
+    def test_invalid_input_raises(self, url):
+        """Test that unparseable input raises ValueError."""
+        with pytest.raises(ValueError):
+            extract_market_slug(url)
+
+
+class TestAnalysisCache:
+    """Test the in-process analysis cache behind format_config_for_market."""
+
+    @pytest.fixture
+    def analyzer(self):
+        """Mocked shared analyzer, with the cache emptied before and after."""
+        clear_analysis_cache()
+        mock = MagicMock()
+        mock.analyze_market.side_effect = lambda slug: replace(
+            _EMPTY_ANALYSIS, market_slug=slug, condition_id=f"0x{slug}"
+        )
+        with patch("pm4.market_config_helper._get_analyzer", return_value=mock):
+            yield mock
+        clear_analysis_cache()
+
+    @pytest.mark.unit
+    def test_hit_miss_and_expiry(self, analyzer):
+        """Test that a repeat within the TTL is served locally and re-fetched after."""
+        with patch("pm4.market_config_helper.now_ms", return_value=1_000_000):
+            first = _cached_analyze("some-market")
+            assert _cached_analyze("some-market") is first
+            _cached_analyze("other-market")
+        assert analyzer.analyze_market.call_count == 2
+
+        with patch("pm4.market_config_helper.now_ms", return_value=1_000_000 + ANALYSIS_CACHE_TTL_MS + 1):
+            assert _cached_analyze("some-market") is not first
+        assert analyzer.analyze_market.call_count == 3
+
+    @pytest.mark.unit
+    def test_clear_analysis_cache(self, analyzer):
+        """Test that clearing the cache forces a fresh analysis."""
+        _cached_analyze("some-market")
+        clear_analysis_cache()
+        _cached_analyze("some-market")
+
+        assert analyzer.analyze_market.call_count == 2
+
+    @pytest.mark.unit
+    def test_failed_analysis_is_not_cached(self, analyzer):
+        """Test that an empty analysis (API failure) is retried on the next call."""
+        analyzer.analyze_market.side_effect = lambda slug: replace(_EMPTY_ANALYSIS, market_slug=slug)
+
+        assert _cached_analyze("flaky-market").condition_id == ""
+        _cached_analyze("flaky-market")
+
+        assert analyzer.analyze_market.call_count == 2
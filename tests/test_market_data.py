@@ -155,6 +155,36 @@ class TestMarketData:
         assert md.state.mid == 0.5
         assert md.state.last_book_ts_ms == 1703123456789
 
+    @pytest.mark.unit
+    def test_on_book_timestamp_fallback(self, mock_logger):
+        """Test that the local clock is only used when the feed omits a timestamp."""
+        md = MarketData(mock_logger)
+
+        with patch('pm4.market_data.now_ms', return_value=1703123000000) as mock_now:
+            md.on_book({"bids": [], "asks": [], "timestamp": "1703123456789"})
+            assert md.state.last_book_ts_ms == 1703123456789
+            mock_now.assert_not_called()
+
+            md.on_book({"bids": [], "asks": []})
+            assert md.state.last_book_ts_ms == 1703123000000
+
+    @pytest.mark.unit
+    def test_on_book_unsorted_levels(self, mock_logger):
+        """Test that trust_sorted=False finds the best level in any order."""
+        md = MarketData(mock_logger, trust_sorted=False)
+
+        msg = {
+            "bids": [{"price": "0.40", "size": "10"}, {"price": "0.45", "size": "5"}],
+            "asks": [{"price": "0.60", "size": "10"}, {"price": "0.55", "size": "5"}],
+            "timestamp": 1703123456789,
+        }
+
+        md.on_book(msg)
+
+        assert md.state.best_bid == 0.45
+        assert md.state.best_ask == 0.55
+        assert md.state.mid == 0.5
+
     @pytest.mark.unit
     def test_on_book_empty_book(self, mock_logger):
         """Test processing book messages with empty order book."""
@@ -259,6 +289,36 @@ class TestMarketData:
         assert md.state.best_bid == 0.48  # Valid from second change
         assert md.state.best_ask == 0.52  # Valid from first change
 
+    @pytest.mark.unit
+    def test_on_price_change_single_malformed_update(self, mock_logger):
+        """Test that a lone malformed change leaves that side untouched."""
+        md = MarketData(mock_logger)
+        md.state.best_bid = 0.45
+        md.state.best_ask = 0.55
+
+        md.on_price_change({
+            "price_changes": [{"best_bid": "invalid_price", "best_ask": "0.53"}],
+            "timestamp": 1703123456789,
+        })
+
+        assert md.state.best_bid == 0.45
+        assert md.state.best_ask == 0.53
+
+    @pytest.mark.unit
+    def test_on_price_change_without_prices(self, mock_logger):
+        """Test that a change carrying no usable prices is not logged."""
+        md = MarketData(mock_logger)
+
+        md.on_price_change({
+            "price_changes": [{"best_bid": None}, {"best_ask": "invalid_price"}],
+            "timestamp": 1703123456789,
+        })
+
+        assert md.state.best_bid == 0.0
+        assert md.state.best_ask == 1.0
+        assert md.state.last_book_ts_ms == 1703123456789
+        mock_logger.write.assert_not_called()
+
     @pytest.mark.unit
     def test_on_tick_size_change(self, mock_logger):
         """Test processing tick size change messages."""
@@ -299,6 +359,17 @@ class TestMarketData:
             "side": "BUY",
         })
 
+    @pytest.mark.unit
+    def test_handle_dispatch(self, mock_logger):
+        """Test routing WS messages by event type."""
+        md = MarketData(mock_logger)
+
+        assert md.handle("tick_size_change", {"new_tick_size": "0.001"}) is True
+        assert md.state.tick_size == 0.001
+
+        assert md.handle("unknown_event", {}) is False
+        assert md.handle(None, {}) is False
+
     @pytest.mark.unit
     def test_trade_rate_per_s_no_trades(self, mock_logger):
         """Test trade rate calculation with no trades."""
@@ -388,6 +459,20 @@ class TestMarketData:
             # Should include the trade at current time
             assert rate > 0
 
+    @pytest.mark.unit
+    def test_trade_rate_per_s_full_buffer(self, mock_logger):
+        """Test trade rate counting on a full buffer split by the window."""
+        md = MarketData(mock_logger)
+
+        current_time = 1703123456789
+        # One trade every 100ms: 601 of the 5000 are within 60s (cutoff inclusive)
+        md.trade_ts.extend(current_time - 100 * i for i in reversed(range(5000)))
+
+        with patch('pm4.market_data.now_ms', return_value=current_time):
+            rate = md.trade_rate_per_s(window_s=60.0)
+
+        assert rate == pytest.approx(601 / 60.0)
+
     @pytest.mark.unit
     def test_trade_ts_buffer_limit(self, mock_logger):
         """Test that trade_ts respects buffer size limit."""
@@ -3,17 +3,18 @@ Tests for utility functions in pm4/utils.py.
 
 Tests cover:
 - Mathematical functions (logit, sigmoid, clip)
-- Time utilities (now_ms)
+- Time utilities (now_ms, parse_iso8601)
 - Price rounding functions (floor_to_tick, ceil_to_tick)
 - Formatting utilities (fmt)
 """
 import math
 import time
+from datetime import datetime, timezone
 from unittest.mock import patch
 
 import pytest
 
-from pm4.utils import ceil_to_tick, clip, floor_to_tick, fmt, logit, now_ms, sigmoid
+from pm4.utils import ceil_to_tick, clip, floor_to_tick, fmt, logit, now_ms, parse_iso8601, sigmoid
 
 
 class TestTimeUtils:
@@ -35,6 +36,19 @@ class TestTimeUtils:
         # Allow for some test execution time difference
         assert abs(result - current_time_ms) < 10000  # Within 10 seconds
 
+    @pytest.mark.unit
+    def test_parse_iso8601_utc_suffix(self):
+        """Test that a trailing 'Z' parses as UTC."""
+        result = parse_iso8601("2025-01-01T12:30:00Z")
+        assert result == datetime(2025, 1, 1, 12, 30, tzinfo=timezone.utc)
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("value", ["not a date", "2025-13-01"])
+    def test_parse_iso8601_invalid(self, value):
+        """Test that malformed timestamps raise ValueError."""
+        with pytest.raises(ValueError):
+            parse_iso8601(value)
+
 
 class TestClipping:
     """Test value clipping functionality."""